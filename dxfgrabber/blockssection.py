@@ -9,6 +9,19 @@ from itertools import islice
 
 from .tags import TagGroups
 from .entitysection import build_entities
+from .const import BLK_ANONYMOUS
+
+
+def _block_index(group):
+    """ Returns name and anonymous state of the BLOCK tag group without building the block. """
+    name = ''
+    flags = 0
+    for tag in group:
+        if tag.code == 2:
+            name = tag.value
+        elif tag.code == 70:
+            flags = int(tag.value)
+    return name, bool(flags & BLK_ANONYMOUS) or name.startswith('*')
 
 
 class BlocksSection(object):
@@ -16,42 +29,74 @@ class BlocksSection(object):
 
     def __init__(self):
         self._blocks = dict()
+        self._lazy = dict()  # tag groups of anonymous blocks that are built on first access
+        self.on_build = None  # callable(block) for blocks built after the drawing was loaded
 
     @staticmethod
     def from_tags(tags, drawing):
         blocks_section = BlocksSection()
         if drawing.grab_blocks:
-            blocks_section._build(tags)
+            blocks_section._build(tags, drawing.anonymous_blocks)
         return blocks_section
 
-    def _build(self, tags):
+    def _build(self, tags, anonymous_blocks='build'):
+        """
+        anonymous_blocks: 'build' all blocks, 'skip' anonymous blocks (dimensions, hatches, dynamic blocks) or build
+                          them 'lazy' on first access
+        """
         if len(tags) == 3:  # empty block section
             return
         groups = list()
         for group in TagGroups(islice(tags, 2, len(tags)-1)):
             groups.append(group)
             if group[0].value == 'ENDBLK':
-                entities = build_entities(groups)
-                block = entities[0]
-                block.set_entities(entities[1:-1])
-                self._add(block)
+                name, anonymous = _block_index(groups[0])
+                if anonymous and anonymous_blocks == 'skip':
+                    pass
+                elif anonymous and anonymous_blocks == 'lazy':
+                    self._lazy[name] = groups
+                else:
+                    self._add(self._build_block(groups))
                 groups = list()
 
+    @staticmethod
+    def _build_block(groups):
+        entities = build_entities(groups)
+        block = entities[0]
+        block.set_entities(entities[1:-1])
+        return block
+
+    def _build_lazy(self, name):
+        groups = self._lazy.pop(name, None)
+        if groups is not None:
+            block = self._build_block(groups)
+            self._add(block)
+            if self.on_build is not None:
+                self.on_build(block)
+
     def _add(self, block):
         self._blocks[block.name] = block
 
+    def built_blocks(self):
+        """ Iterates over the blocks without building lazy ones. """
+        return iter(list(self._blocks.values()))
+
     # start of public interface
     def __len__(self):
-        return len(self._blocks)
+        return len(self._blocks) + len(self._lazy)
 
     def __iter__(self):
+        for name in list(self._lazy):
+            self._build_lazy(name)
         return iter(self._blocks.values())
 
     def __contains__(self, name):
-        return name in self._blocks
+        return name in self._blocks or name in self._lazy
 
     def __getitem__(self, name):
+        self._build_lazy(name)
         return self._blocks[name]
 
     def get(self, name, default=None):
+        self._build_lazy(name)
         return self._blocks.get(name, default)
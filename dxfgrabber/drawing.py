@@ -12,6 +12,8 @@ DEFAULT_OPTIONS = {
     "grab_blocks": True,  # import block definitions True=yes, False=No
     "assure_3d_coords": False,  # guarantees (x, y, z) tuples for ALL coordinates
     "resolve_text_styles": True,  # Text, Attrib, Attdef and MText attributes will be set by the associated text style if necessary
+    "anonymous_blocks": "build",  # anonymous blocks (*D, *U, *X, ...): "build", "lazy" = on first access, "skip"
+    "entity_filter": None,  # callable(dxftype, layer) -> bool, rejected entities of the ENTITIES section are not built
 }
 
 
@@ -22,6 +24,8 @@ class Drawing(object):
         self.grab_blocks = options.get('grab_blocks', True)
         self.assure_3d_coords = options.get('assure_3d_coords', False)
         self.resolve_text_styles = options.get('resolve_text_styles', True)
+        self.entity_filter = options.get('entity_filter', None)
+        self.anonymous_blocks = options.get('anonymous_blocks', 'build')
 
         tagreader = stream_tagger(stream, self.assure_3d_coords)
         self.dxfversion = 'AC1009'
@@ -43,8 +47,9 @@ class Drawing(object):
 
         if self.resolve_text_styles:
             resolve_text_styles(self.entities, self.styles)
-            for block in self.blocks:
+            for block in self.blocks.built_blocks():
                 resolve_text_styles(block, self.styles)
+            self.blocks.on_build = lambda block: resolve_text_styles(block, self.styles)
 
     def modelspace(self):
         return (entity for entity in self.entities if not entity.paperspace)
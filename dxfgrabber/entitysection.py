@@ -14,6 +14,7 @@ from .dxfentities import entity_factory
 
 class EntitySection(object):
     name = 'entities'
+    filtered = True  # apply the entity_filter option of the drawing
 
     def __init__(self):
         self._entities = list()
@@ -21,7 +22,7 @@ class EntitySection(object):
     @classmethod
     def from_tags(cls, tags, drawing):
         entity_section = cls()
-        entity_section._build(tags)
+        entity_section._build(tags, drawing.entity_filter if cls.filtered else None)
         return entity_section
 
     def get_entities(self):
@@ -40,18 +41,36 @@ class EntitySection(object):
 
     # end of public interface
 
-    def _build(self, tags):
+    def _build(self, tags, entity_filter=None):
         if len(tags) == 3:  # empty entities section
             return
         groups = TagGroups(islice(tags, 2, len(tags)-1))
-        self._entities = build_entities(groups)
+        self._entities = build_entities(groups, entity_filter)
 
 
 class ObjectsSection(EntitySection):
     name = 'objects'
+    filtered = False
 
 
-def build_entities(tag_groups):
+def _has_followers(group):
+    """ True if VERTEX or ATTRIB entities up to a SEQEND belong to this entity. """
+    dxftype = group[0].value
+    if dxftype == 'POLYLINE':
+        return True
+    if dxftype == 'INSERT':
+        try:
+            return int(group.get_value(66)) == 1
+        except ValueError:
+            return False
+    return False
+
+
+def build_entities(tag_groups, entity_filter=None):
+    """
+    entity_filter: optional callable(dxftype, layer) -> bool; rejected entities are skipped before they are built,
+    together with their VERTEX/ATTRIB followers. POLYFACE and POLYMESH entities are filtered as 'POLYLINE'.
+    """
     def build_entity(group):
         try:
             entity = entity_factory(Tags(group))
@@ -59,9 +78,23 @@ def build_entities(tag_groups):
             entity = None  # ignore unsupported entities
         return entity
 
+    def accept(group):
+        try:
+            layer = group.get_value(8)
+        except ValueError:
+            layer = '0'
+        return entity_filter(group[0].value, layer)
+
     entities = list()
     collector = None
+    skip_followers = False
     for group in tag_groups:
+        if skip_followers:
+            skip_followers = group[0].value != 'SEQEND'
+            continue
+        if entity_filter is not None and collector is None and not accept(group):
+            skip_followers = _has_followers(group)
+            continue
         entity = build_entity(group)
         if entity is not None:
             if collector:
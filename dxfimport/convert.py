@@ -19,6 +19,7 @@
 # <pep8 compliant>
 
 import itertools
+import numpy as np
 from . import is_
 from .fake_entities import ArcEntity
 from mathutils import Vector, Matrix, Euler, Color
@@ -166,37 +167,112 @@ def bulge_to_arc(point, next, bulge):
     return ArcEntity(startangle, endangle, center.to_3d(), radius, angdir)
 
 
-def bulgepoly_to_cubic(do, lwpolyline):
+def _points3(points):
     """
-    do: instance of Do()
-    lwpolyline: DXF entity of type polyline
-    Bulges define how much a straight segment of a polyline should be transformed to an arc. Hence do.arc() is called
-    for segments with a bulge and all segments are being connected to a cubic bezier curve in the end.
-    Reference: http://www.afralisp.net/archive/lisp/Bulges1.htm
+    points: list of 2d or 3d coordinates
+    Returns a (n, 3) numpy array.
     """
-    def handle_segment(last, point, bulge):
-        if bulge != 0 and not ((point - last).length == 0 or point == last):
-            arc = bulge_to_arc(last, point, bulge)
-            cubic_bezier = do.arc(arc, None, aunits=1, angdir=arc.angdir,  angbase=0)
-        else:
-            la = last.to_3d()
-            po = point.to_3d()
-            section = point - last
-            cubic_bezier = [la, la + section * 1 / 3, la + section * 2 / 3, po]
-        return cubic_bezier
+    co = np.zeros((len(points), 3))
+    for i, p in enumerate(points):
+        co[i, :len(p)] = p[:3]
+    return co
 
-    points = lwpolyline.points
-    bulges = lwpolyline.bulge
-    lenpo = len(points)
-    spline = []
-    for i in range(1, lenpo):
-        spline += handle_segment(Vector(points[i - 1]), Vector(points[i]), bulges[i - 1])[:-1]
 
-    if lwpolyline.is_closed:
-        spline += handle_segment(Vector(points[-1]), Vector(points[0]), bulges[-1])
-    else:
-        spline.append(points[-1])
-    return spline
+def bulgepolys_to_cubic(polylines):
+    """
+    polylines: list of DXF entities of type polyline
+    Bulges define how much a straight segment of a polyline should be transformed to an arc. All segments of all
+    polylines are converted to cubic bezier segments in one vectorized pass; an arc segment is split into equal
+    sub-segments of at most 90 degrees.
+    Returns (points, offsets): points is a (n, 3, 3) array of unprojected (handle_left, co, handle_right) rows of all
+    polylines; the bezier points of polyline i are points[offsets[i]:offsets[i + 1]].
+    Reference: http://www.afralisp.net/archive/lisp/Bulges1.htm
+    """
+    # segments of all polylines, including the closing segment of closed ones
+    p0, p1, bulges, seg_counts = [], [], [], []
+    for en in polylines:
+        points = _points3(en.points)
+        bulge = np.zeros(len(points))
+        bulge[:len(en.bulge)] = en.bulge[:len(points)]
+        if not en.is_closed:
+            points, bulge = points[:-1], bulge[:-1]
+        p0.append(points)
+        p1.append(np.roll(points, -1, axis=0) if en.is_closed else _points3(en.points)[1:])
+        bulges.append(bulge)
+        seg_counts.append(len(points))
+
+    p0 = np.concatenate(p0)
+    p1 = np.concatenate(p1)
+    bulge = np.concatenate(bulges)
+    chord = p1 - p0
+    is_arc = (bulge != 0) & (np.hypot(chord[:, 0], chord[:, 1]) > 0)
+
+    # arc center and radius; the included angle is 4 * atan(bulge), counterclockwise for positive bulges
+    b = np.where(is_arc, bulge, 1)
+    theta = np.where(is_arc, 4 * np.arctan(b), 0)
+    normal = np.stack((-chord[:, 1], chord[:, 0]), axis=1)
+    center = (p0[:, :2] + p1[:, :2]) / 2 + normal * ((1 - b ** 2) / (4 * b))[:, None]
+    radius = np.hypot(p0[:, 0] - center[:, 0], p0[:, 1] - center[:, 1])
+    alpha = np.arctan2(p0[:, 1] - center[:, 1], p0[:, 0] - center[:, 0])
+
+    # sub-segments
+    count = np.where(is_arc, np.maximum(1, np.ceil(np.abs(theta) / (pi / 2) - 1e-9)), 1).astype(int)
+    seg = np.repeat(np.arange(len(count)), count)
+    i = np.arange(len(seg)) - np.repeat(np.cumsum(count) - count, count)
+    n = count[seg]
+    phi = theta[seg] / n
+    a0 = alpha[seg] + i * phi
+    a1 = a0 + phi
+    k = (4 / 3 * np.tan(phi / 4) * radius[seg])[:, None]
+    c = center[seg]
+    r = radius[seg][:, None]
+    t0 = (i / n)[:, None]
+    t1 = ((i + 1) / n)[:, None]
+
+    start = p0[seg] + chord[seg] * t0
+    end = p0[seg] + chord[seg] * t1
+    h1 = p0[seg] + chord[seg] * ((i + 1 / 3) / n)[:, None]
+    h2 = p0[seg] + chord[seg] * ((i + 2 / 3) / n)[:, None]
+
+    arc = is_arc[seg]
+    cos0, sin0 = np.cos(a0)[:, None], np.sin(a0)[:, None]
+    cos1, sin1 = np.cos(a1)[:, None], np.sin(a1)[:, None]
+    arc_start = c + r * np.hstack((cos0, sin0))
+    arc_end = c + r * np.hstack((cos1, sin1))
+    start[arc, :2] = arc_start[arc]
+    end[arc, :2] = arc_end[arc]
+    h1[arc, :2] = (arc_start + k * np.hstack((-sin0, cos0)))[arc]
+    h2[arc, :2] = (arc_end - k * np.hstack((-sin1, cos1)))[arc]
+
+    # segment boundaries are the exact polyline vertices
+    start[i == 0] = p0[seg[i == 0]]
+    end[i == n - 1] = p1[seg[i == n - 1]]
+
+    # assemble the bezier points of every polyline
+    rows = []
+    offsets = [0]
+    owner = np.repeat(np.arange(len(polylines)), seg_counts)
+    sub_bounds = np.cumsum(np.bincount(owner[seg], minlength=len(polylines)))
+    first = 0
+    for en, last in zip(polylines, sub_bounds):
+        s, e, hr, hl = start[first:last], end[first:last], h1[first:last], h2[first:last]
+        if len(s) == 0:
+            block = np.empty((0, 3, 3))
+        elif en.is_closed:
+            block = np.stack((np.roll(hl, 1, axis=0), s, hr), axis=1)
+        else:
+            block = np.empty((len(s) + 1, 3, 3))
+            block[:-1, 1] = s
+            block[:-1, 2] = hr
+            block[1:, 0] = hl
+            block[0, 0] = s[0]
+            block[-1, 1] = e[-1]
+            block[-1, 2] = e[-1]
+        rows.append(block)
+        offsets.append(offsets[-1] + len(block))
+        first = last
+
+    return np.concatenate(rows), offsets
 
 
 def bulgepoly_to_lenlist(lwpolyline):
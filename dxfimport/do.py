@@ -21,12 +21,13 @@
 import bpy
 import os
 import re
+import numpy as np
 from mathutils import Vector, Matrix, Euler, Color, geometry
 from math import pi, radians, sqrt
 
 import bmesh
 from .. import dxfgrabber
-from . import convert, is_, groupsort
+from . import convert, is_, groupsort, prepare
 from .line_merger import line_merger
 from ..transverse_mercator import TransverseMercator
 
@@ -44,6 +45,17 @@ SEPARATED = 3
 LINKED_OBJECTS = 4
 GROUP_INSTANCES = 5
 BY_BLOCK = 6
+COLLECTION_INSTANCES = 7
+
+# bpy.data collections recorded in Do.manifest; in this order the datablocks can be removed front to back
+MANIFEST_DATA = ("objects", "curves", "meshes", "lights", "collections", "scenes")
+
+# batch type of INSERTs that combined_objects() commits as duplifaces of one block
+BLOCK_INSERTS = "block_inserts"
+# separated entities imported per step of Do.iter_entities()
+SEPARATED_CHUNK = 200
+
+_BULGE_POLYS = frozenset(("LWPOLYLINE", "POLYLINE", "POLYGON"))
 
 
 def transform(p1, p2, c1, c2, c3):
@@ -69,6 +81,65 @@ def transform(p1, p2, c1, c2, c3):
             return (c1, c2, c3)
 
 
+def prescan(dxf_filename):
+    """
+    dxf_filename: path of the DXF file
+    Reads the LAYER table and counts the modelspace and paperspace entities per layer and DXF type without building
+    any entity or block. Returns (list of layer names, dict {(layer, dxftype): count}) to offer a selection for
+    Do(layers=..., dxftypes=...).
+    """
+    counts = {}
+
+    def count(dxftype, layer):
+        key = (layer, dxftype)
+        counts[key] = counts.get(key, 0) + 1
+        return False
+
+    dwg = dxfgrabber.readfile(dxf_filename, {"grab_blocks": False, "resolve_text_styles": False,
+                                             "entity_filter": count})
+    return dwg.layers.names(), counts
+
+
+def entity_filter(layers=None, dxftypes=None):
+    """
+    layers, dxftypes: collections of selected layer names and DXF types; None selects all
+    Returns the dxfgrabber entity_filter option for the selection, or None if everything is selected.
+    """
+    if layers is None and dxftypes is None:
+        return None
+    layers = None if layers is None else frozenset(layers)
+    dxftypes = None if dxftypes is None else frozenset(dxftypes)
+
+    def accept(dxftype, layer):
+        return (layers is None or layer in layers) and (dxftypes is None or dxftype in dxftypes)
+    return accept
+
+
+def _vec3(co):
+    """
+    co: 2d or 3d coordinate
+    Returns a 3d numpy vector.
+    """
+    v = np.zeros(3)
+    v[:len(co)] = co[:3]
+    return v
+
+
+def _array3(points):
+    """
+    points: sequence of 2d or 3d coordinates
+    Returns a (n, 3) numpy array.
+    """
+    try:
+        points = np.asarray(points, dtype=np.float64).reshape(len(points), -1)
+    except ValueError:
+        # mixed 2d and 3d coordinates
+        return np.array([_vec3(co) for co in points]).reshape(-1, 3)
+    co = np.zeros((len(points), 3))
+    co[:, :min(3, points.shape[1])] = points[:, :3]
+    return co
+
+
 def float_len(f):
     s = str(f)
     if 'e' in s:
@@ -94,16 +165,29 @@ class Do:
     __slots__ = (
         "dwg", "combination", "known_blocks", "import_text", "import_light", "export_acis", "merge_lines",
         "do_bounding_boxes", "acis_files", "errors", "block_representation", "recenter", "did_group_instance",
-        "objects_before", "pDXF", "pScene", "thickness_and_width", "but_group_by_att", "current_scene",
-        "dxf_unit_scale"
+        "manifest", "pDXF", "pScene", "thickness_and_width", "but_group_by_att", "current_scene",
+        "dxf_unit_scale", "threads", "scene_offset", "aunits", "angbase", "angdir", "simplify_tolerance",
+        "removed_vertices", "profiles", "profile_collection", "curves_as_edges", "chord_tolerance",
+        "texts", "text_as_mesh", "bounds", "block_chain",
+        "block_inserts", "block_paths", "block_templates", "template_group", "anonymous_blocks"
     )
 
     def __init__(self, dxf_filename, c=BY_LAYER, import_text=True, import_light=True, export_acis=True,
                  merge_lines=True, do_bbox=True, block_rep=LINKED_OBJECTS, recenter=False, pDXF=None, pScene=None,
-                 thicknessWidth=True, but_group_by_att=True, dxf_unit_scale=1.0):
-        self.dwg = dxfgrabber.readfile(dxf_filename, {"assure_3d_coords": True})
+                 thicknessWidth=True, but_group_by_att=True, dxf_unit_scale=1.0, threads=None, simplify_tolerance=0.0,
+                 layers=None, dxftypes=None, curves_as_edges=False, chord_tolerance=0.001,
+                 text_as_mesh=False, anonymous_blocks="lazy"):
+        # unselected layers and types are skipped by the parser and never built; anonymous blocks (dimensions,
+        # hatches, dynamic blocks) are skipped or only built once an INSERT needs them
+        self.dwg = dxfgrabber.readfile(dxf_filename, {
+            "assure_3d_coords": True,
+            "entity_filter": entity_filter(layers, dxftypes),
+            "anonymous_blocks": "skip" if anonymous_blocks == "skip" else "lazy",
+        })
+        self.anonymous_blocks = anonymous_blocks
         self.combination = c
         self.known_blocks = {}
+        self.block_chain = []  # blocks whose collection is being built, see _block_collection()
         self.import_text = import_text
         self.import_light = import_light
         self.export_acis = export_acis
@@ -114,13 +198,51 @@ class Do:
         self.block_representation = block_rep
         self.recenter = recenter
         self.did_group_instance = False
-        self.objects_before = []
+        self.manifest = {data: [] for data in MANIFEST_DATA}
         self.pDXF = pDXF
         self.pScene = pScene
         self.thickness_and_width = thicknessWidth
         self.but_group_by_att = but_group_by_att
         self.current_scene = None
         self.dxf_unit_scale = dxf_unit_scale
+        self.threads = threads
+        self.scene_offset = Vector((0, 0, 0))
+        self.simplify_tolerance = simplify_tolerance
+        self.removed_vertices = 0
+        self.profiles = {}
+        self.profile_collection = None
+        self.curves_as_edges = curves_as_edges
+        self.chord_tolerance = chord_tolerance
+        self.texts = {}
+        self.text_as_mesh = text_as_mesh
+        self.bounds = {}  # object space bounds by datablock, see _local_bounds()
+        self.block_inserts = {}
+        self.block_paths = {}
+        self.block_templates = {}
+        self.template_group = None
+
+        # angle settings are resolved once per import
+        self.aunits = self.dwg.header.get('$AUNITS', 0)
+        self.angbase = self.dwg.header.get('$ANGBASE', 0)
+        self.angdir = self.dwg.header.get('$ANGDIR', 0)
+
+    def _new(self, data, *args):
+        """
+        data: name of the bpy.data collection, one of MANIFEST_DATA
+        Creates a datablock with bpy.data.<data>.new(*args) and records it in the manifest.
+        """
+        block = getattr(bpy.data, data).new(*args)
+        self.manifest[data].append(block)
+        return block
+
+    def _copy(self, o):
+        """
+        o: Blender object
+        Returns a copy of o that is recorded in the manifest.
+        """
+        oc = o.copy()
+        self.manifest["objects"].append(oc)
+        return oc
 
     def proj(self, co, elevation=0):
         """
@@ -140,19 +262,9 @@ class Do:
                 c1 *= u
                 c2 *= u
                 c3 *= u
-            # add
-            add = Vector((0, 0, 0))
-            if "latitude" in self.current_scene and "longitude" in self.current_scene:
-                if PYPROJ and type(self.pScene) not in (TransverseMercator, Indicator):
-                    wgs84 = Proj(init="EPSG:4326")
-                    cscn_lat = self.current_scene.get('latitude', 0)
-                    cscn_lon = self.current_scene.get('longitude', 0)
-                    cscn_alt = self.current_scene.get('altitude', 0)
-                    add = Vector(transform(wgs84, self.pScene, cscn_lon, cscn_lat, cscn_alt))
-
             # projection
             newco = Vector(transform(self.pDXF, self.pScene, c1, c2, c3))
-            newco = newco - add
+            newco = newco - self.scene_offset
             if any((c == float("inf") or c == float("-inf") for c in newco)):
                 self.errors.add("Projection results in +/- infinity coordinates.")
             return newco
@@ -172,6 +284,35 @@ class Do:
             else:
                 return Vector((co[0], co[1], co[2] + elevation if len(co) == 3 else elevation))
 
+    def proj_array(self, points, elevation=0):
+        """
+        points: sequence of coordinates
+        elevation: float (lwpolyline code 38)
+        return: (n, 3) numpy array; vectorized counterpart of proj() that is safe to call from worker threads
+        """
+        if self.pScene is not None and self.pDXF is not None:
+            return np.array([self.proj(co, elevation) for co in points], dtype=np.float64).reshape(-1, 3)
+
+        co = _array3(points)
+        co[:, 2] += elevation
+        if self.dxf_unit_scale != 1:
+            co *= self.dxf_unit_scale
+        return co
+
+    def _scene_offset(self, scene):
+        """
+        Offset between the projected coordinates and an already georeferenced scene; resolved once per import so
+        that proj() does not read scene properties for every coordinate.
+        """
+        if self.pScene is not None and self.pDXF is not None and "latitude" in scene and "longitude" in scene:
+            if PYPROJ and type(self.pScene) not in (TransverseMercator, Indicator):
+                wgs84 = Proj(init="EPSG:4326")
+                cscn_lat = scene.get('latitude', 0)
+                cscn_lon = scene.get('longitude', 0)
+                cscn_alt = scene.get('altitude', 0)
+                return Vector(transform(wgs84, self.pScene, cscn_lon, cscn_lat, cscn_alt))
+        return Vector((0, 0, 0))
+
     def georeference(self, scene, center):
         if "latitude" not in scene and "longitude" not in scene:
             if type(self.pScene) is TransverseMercator:
@@ -185,47 +326,28 @@ class Do:
                 scene['latitude'] = latlon[1]
                 scene['altitude'] = latlon[2]
 
-    """ GEOMETRY DXF TYPES TO BLENDER CURVES FILTERS"""
-    # type(self, dxf entity, blender curve data)
+    """ GEOMETRY DXF TYPES TO PREPARED CURVES FILTERS"""
+    # type(self, dxf entity, prepare.Curve)
+    # preparation stage: runs in worker threads, so no bpy calls in here
 
     def _cubic_bezier_closed(self, ptuple, curve):
-        count = (len(ptuple)-1)/3
+        count = (len(ptuple) - 1) // 3
         points = [ptuple[-2]]
-        ptuples = ptuple[:-2]
-        points += [p for p in ptuples]
-
-        spl = curve.splines.new('BEZIER')
-        spl.use_cyclic_u = True
-        b = spl.bezier_points
-        b.add(count - 1)
-        for i, j in enumerate(range(1, len(points), 3)):
-            b[i].handle_left = self.proj(points[j - 1])
-            b[i].co = self.proj(points[j])
-            b[i].handle_right = self.proj(points[j + 1])
-
-    def _cubic_bezier_open(self, points, curve):
-        count = (len(points) - 1) / 3 + 1
-        spl = curve.splines.new('BEZIER')
-        b = spl.bezier_points
-        b.add(count - 1)
-
-        b[0].co = self.proj(points[0])
-        b[0].handle_left = self.proj(points[0])
-        b[0].handle_right = self.proj(points[1])
+        points += ptuple[:-2]
 
-        b[-1].co = self.proj(points[-1])
-        b[-1].handle_right = self.proj(points[-1])
-        b[-1].handle_left = self.proj(points[-2])
+        b = self.proj_array(points).reshape(-1, 3, 3)[:count]
+        curve.bezier(b[:, 1], b[:, 0], b[:, 2], cyclic=True)
 
-        for i, j in enumerate(range(3, len(points) - 2, 3), 1):
-            b[i].handle_left = self.proj(points[j - 1])
-            b[i].co = self.proj(points[j])
-            b[i].handle_right = self.proj(points[j + 1])
+    def _cubic_bezier_open(self, points, curve):
+        # first and last control point get a handle on top of themselves
+        p = self.proj_array(points)
+        b = np.concatenate((p[:1], p, p[-1:])).reshape(-1, 3, 3)
+        curve.bezier(b[:, 1], b[:, 0], b[:, 2])
 
     def _cubic_bezier(self, points, curve, is_closed):
         """
         points: control points; list of (x,y,z) tuples
-        curve: Blender curve data of type "CURVE" (object.data) where the bezier should be added to
+        curve: prepare.Curve where the bezier should be added to
         is_closed: True / False to indicate if the curve is open or closed
         """
         if is_closed:
@@ -236,139 +358,166 @@ class Do:
     def _poly(self, points, curve, elevation=0, is_closed=False):
         """
         points: list of (x,y,z)
-        curve: Blender curve data of type "CURVE" (object.data) to which the poly should be added to
+        curve: prepare.Curve to which the poly should be added to
         param elevation: float (lwpolyline code 38)
         is_closed: True / False to indicate if the polygon is open or closed
+        Vertices are simplified in drawing units if simplify_tolerance is set.
         """
-        p = curve.splines.new("POLY")
-        p.use_smooth = False
-        p.use_cyclic_u = is_closed
-        p.points.add(len(points) - 1)
+        if self.simplify_tolerance > 0:
+            points, removed = prepare.simplify(_array3(points), self.simplify_tolerance, is_closed)
+            curve.removed += removed
+        curve.poly(self.proj_array(points, elevation), is_closed)
+
+    def _polys(self, point_lists, closed, elevations, curve):
+        """
+        point_lists: list of vertex lists, one per polyline
+        closed: list of bools; elevations: list of floats (lwpolyline code 38)
+        curve: prepare.Curve to which the polys should be added to
+        Batched counterpart of _poly(): all vertices are converted and projected in one array, only the
+        simplification runs per polyline.
+        """
+        counts = [len(points) for points in point_lists]
+        co = _array3([p for points in point_lists for p in points])
+        co[:, 2] += np.repeat(np.asarray(elevations, dtype=np.float64), counts)
+        splits = np.cumsum(counts)[:-1]
+        polys = np.split(co, splits)
+
+        if self.simplify_tolerance > 0:
+            for i, is_closed in enumerate(closed):
+                polys[i], removed = prepare.simplify(polys[i], self.simplify_tolerance, is_closed)
+                curve.removed += removed
+            counts = [len(co) for co in polys]
+            splits = np.cumsum(counts)[:-1]
+            co = np.concatenate(polys) if polys else co
 
-        for i, pt in enumerate(points):
-            p.points[i].co = self.proj(pt, elevation).to_4d()
+        for points, is_closed in zip(np.split(self.proj_array(co), splits), closed):
+            curve.poly(points, is_closed)
+
+    def polys(self, entities, curve):
+        """
+        entities: list of DXF entities of type `LWPOLYLINE`, `POLYLINE` or `POLYGON` without bulges
+        curve: prepare.Curve
+        """
+        self._polys([en.points for en in entities], [en.is_closed for en in entities],
+                    [en.elevation if en.dxftype == "LWPOLYLINE" else 0 for en in entities], curve)
 
     def _gen_poly(self, en, curve, elevation=0):
-        if any([b != 0 for b in en.bulge]):
-            self._cubic_bezier(convert.bulgepoly_to_cubic(self, en), curve, en.is_closed)
+        if any(en.bulge):
+            self.bulge_polys([en], curve)
         else:
             self._poly(en.points, curve, elevation, en.is_closed)
 
+    def bulge_polys(self, entities, curve):
+        """
+        entities: list of DXF entities of type `LWPOLYLINE`, `POLYLINE` or `POLYGON` having bulges
+        curve: prepare.Curve
+        Converts and projects the segments of all polylines in one vectorized pass.
+        """
+        points, offsets = convert.bulgepolys_to_cubic(entities)
+        points = self.proj_array(points.reshape(-1, 3)).reshape(-1, 3, 3)
+        for en, start, end in zip(entities, offsets, offsets[1:]):
+            if end > start:
+                b = points[start:end]
+                curve.bezier(b[:, 1], b[:, 0], b[:, 2], cyclic=en.is_closed)
+
     def polyline(self, en, curve):
         """
         en: DXF entity of type `POLYLINE`
-        curve: Blender data structure of type `CURVE`
+        curve: prepare.Curve
         """
         self._gen_poly(en, curve)
 
     def polygon(self, en, curve):
         """
         en: DXF entity of type `POLYGON`
-        curve: Blender data structure of type `CURVE`
+        curve: prepare.Curve
         """
         self._gen_poly(en, curve)
 
     def lwpolyline(self, en, curve):
         """
         en: DXF entity of type `LWPOLYLINE`
-        curve: Blender data structure of type `CURVE`
+        curve: prepare.Curve
         """
         self._gen_poly(en, curve, en.elevation)
 
     def line(self, en, curve):
         """
         en: DXF entity of type `LINE`
-        curve: Blender data structure of type `CURVE`
+        curve: prepare.Curve
         """
         self._poly([en.start, en.end], curve, 0, False)
 
-    def arc(self, en, curve=None, aunits=None, angdir=None, angbase=None):
+    def _angles(self, angles, aunits=None, angbase=None):
         """
-        en: dxf entity (en.start_angle, en.end_angle, en.center, en.radius)
-        curve: optional; Blender curve data of type "CURVE" (object.data) to which the arc should be added to
-        return control points of a cubic spline (do be used in a spline with bulges / series of arcs)
-        note: en.start_angle + en.end_angle: angles measured from the angle base (angbase) in the direction of
-              angdir (1 = clockwise, 0 = counterclockwise)
+        angles: numpy array of angles measured from the angle base (angbase) in the drawing's angle units
+        aunits, angbase: optional; override the header settings of the drawing
+        Returns the angles in radians.
         """
-        threshold = 0.005
-
         if aunits is None:
-            aunits = self.dwg.header.get('$AUNITS', 0)
+            aunits = self.aunits
         if angbase is None:
-            angbase = self.dwg.header.get('$ANGBASE', 0)
-        if angdir is None:
-            angdir = self.dwg.header.get('$ANGDIR', 0)
-        kappa = 0.5522848
+            angbase = self.angbase
 
         # TODO: add support for 1 (dms) and 4 (survey)
         if aunits == 0:
             # Degree
-            s = radians(en.start_angle+angbase)
-            e = radians(en.end_angle+angbase)
+            return np.radians(angles + angbase)
         elif aunits == 2:
             # Gradians
-            s = radians(0.9 * (en.start_angle + angbase))
-            e = radians(0.9 * (en.end_angle + angbase))
+            return np.radians(0.9 * (angles + angbase))
         else:
             # Radians
-            s = en.start_angle+angbase
-            e = en.end_angle+angbase
+            return angles + angbase
 
-        if s > e:
-            e += 2 * pi
-        angle = e - s
-
-        vc = Vector(en.center)
-        x_vec = Vector((1, 0, 0))
-        radius = en.radius
-
-        # turn clockwise
-        if angdir == 0:
-            rot = Matrix.Rotation(radians(-90), 3, "Z")
-            start = x_vec * radius @ Matrix.Rotation(-s, 3, "Z")
-            end = x_vec * radius @ Matrix.Rotation(-e, 3, "Z")
-
-        # turn counter-clockwise
-        else:
-            rot = Matrix.Rotation(radians(90), 3, "Z")
-            start = x_vec * radius @ Matrix.Rotation(s, 3, "Z")
-            end = x_vec * radius @ Matrix.Rotation(e, 3, "Z")
-
-        # start
-        spline = list()
-        spline.append(vc + start)
-        if abs(angle) - pi / 2 > threshold:  # if angle is more than pi/2 incl. threshold
-            spline.append(vc + start + start * kappa @ rot)
-        else:
-            spline.append(vc + start + start * kappa * angle / (pi / 2) @ rot)
-
-        # fill if angle is larger than 90 degrees
-        a = pi / 2
-        if abs(angle) - threshold > a:
-            fill = start
-
-            while abs(angle) - a > threshold:
-                fillnext = fill @ rot
-                spline.append(vc + fillnext + fill * kappa)
-                spline.append(vc + fillnext)
-                # if this was the last fill control point
-                if abs(angle) - a - pi / 2 < threshold:
-                    end_angle = (abs(angle) - a) * abs(angle) / angle
-                    spline.append(vc + fillnext + fillnext * kappa * end_angle / (pi / 2) @ rot)
-                else:
-                    spline.append(vc + fillnext + fillnext * kappa @ rot)
-                fill = fillnext
-                a += pi / 2
-
-        else:
-            end_angle = angle
-
-        # end
-        spline.append(vc + end + end * -kappa * end_angle / (pi / 2) @ rot)
-        spline.append(vc + end)
+    def _arc_batches(self, centers, radii, starts, ends, angdir):
+        """
+        centers: (m, 3) array; radii, starts, ends: (m,) arrays with angles in radians
+        angdir: 1 = clockwise, 0 = counterclockwise
+        Yields (indices, control points) with control points being a (k, 3n+1, 3) array of unprojected cubic bezier
+        control points for the arcs at indices. Arcs are batched by their number of segments only; segment angles
+        and handle lengths are computed per arc, like in convert.bulgepolys_to_cubic().
+        """
+        threshold = 0.005
+        ends = np.where(starts > ends, ends + 2 * pi, ends)
+        sweeps = ends - starts
+        counts = np.maximum(1, np.ceil((sweeps - threshold) / (pi / 2))).astype(int)
+        sign = 1 if angdir == 0 else -1
+
+        keys, inverse = np.unique(counts, return_inverse=True)
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind="stable")
+        splits = np.cumsum(np.bincount(inverse, minlength=len(keys)))[:-1]
+
+        for count, indices in zip(keys, np.split(order, splits)):
+            phi = sweeps[indices] / count
+            a = sign * (starts[indices][:, None] + np.arange(count + 1) * phi[:, None])  # (k, count + 1)
+            p = np.stack((np.cos(a), np.sin(a)), axis=2)
+            t = np.stack((-np.sin(a), np.cos(a)), axis=2) * (sign * 4 / 3 * np.tan(phi / 4))[:, None, None]
+
+            unit = np.empty((len(indices), 3 * count + 1, 2))
+            unit[:, 0::3] = p
+            unit[:, 1::3] = p[:, :-1] + t[:, :-1]
+            unit[:, 2::3] = p[:, 1:] - t[:, 1:]
+
+            points = np.empty((len(indices), 3 * count + 1, 3))
+            points[..., :2] = centers[indices, None, :2] + radii[indices][:, None, None] * unit
+            points[..., 2] = centers[indices, 2, None]
+            yield indices, points
 
-        if len(spline) % 3 != 1:
-            print("DXF-IMPORT: DO ARC: CHECK PLEASE: ", len(spline), spline)
+    def arc(self, en, curve=None, aunits=None, angdir=None, angbase=None):
+        """
+        en: dxf entity (en.start_angle, en.end_angle, en.center, en.radius)
+        curve: optional; prepare.Curve to which the arc should be added to
+        return control points of a cubic spline (do be used in a spline with bulges / series of arcs)
+        note: en.start_angle + en.end_angle: angles measured from the angle base (angbase) in the direction of
+              angdir (1 = clockwise, 0 = counterclockwise)
+        """
+        if angdir is None:
+            angdir = self.angdir
+        angles = self._angles(np.array((en.start_angle, en.end_angle), dtype=np.float64), aunits, angbase)
+        batches = self._arc_batches(_vec3(en.center)[None], np.array((en.radius,)), angles[:1], angles[1:], angdir)
+        spline = next(batches)[1][0]
 
         # curve is None means arc is called from bulge conversion
         # nothing should be projected at this stage, since the
@@ -376,95 +525,87 @@ class Do:
         # as a whole afterwards (small little error; took ages to debug)
         if curve is not None:
             self._cubic_bezier_open(spline, curve)
-            return spline
-        else:
-            return spline
+        return spline
 
-    def circle(self, en, curve, major=Vector((1, 0, 0))):
+    def arcs(self, entities, curve):
         """
-        en: dxf entity
-        curve: Blender curve data of type "CURVE" (object.data) to which the circle should be added to
-        major: optional; if the circle is used as a base for an ellipse, major denotes the ellipse's major direction
+        entities: list of DXF entities of type `ARC`
+        curve: prepare.Curve to which the arcs should be added to
+        Converts all arcs in one vectorized pass per segment count.
         """
-        c = curve.splines.new("BEZIER")
-        c.use_cyclic_u = True
-        b = c.bezier_points
-        b.add(3)
+        centers = _array3([en.center for en in entities])
+        radii = np.array([en.radius for en in entities], dtype=np.float64)
+        starts = self._angles(np.array([en.start_angle for en in entities], dtype=np.float64))
+        ends = self._angles(np.array([en.end_angle for en in entities], dtype=np.float64))
 
-        for i in range(4):
-            b[i].handle_left_type = 'AUTO'
-            b[i].handle_right_type = 'AUTO'
+        for indices, points in self._arc_batches(centers, radii, starts, ends, self.angdir):
+            k, count = points.shape[:2]
+            p = self.proj_array(points.reshape(-1, 3)).reshape(k, count, 3)
+            # first and last control point get a handle on top of themselves
+            b = np.concatenate((p[:, :1], p, p[:, -1:]), axis=1).reshape(k, -1, 3, 3)
+            for spline in b:
+                curve.bezier(spline[:, 1], spline[:, 0], spline[:, 2])
 
-        vc = Vector(en.center)
-        clockwise = Matrix(((0, -1, 0), (1, 0, 0), (0, 0, 1)))
-
-        r = major
-        if len(r) == 2:
-            r = r.to_3d()
-        r = r * en.radius
+    def _ellipse_splines(self, centers, majors, minors, handle_types, curve):
+        """
+        centers, majors, minors: (m, 3) arrays; minor axes point in the (clockwise) direction of the second control
+                                 point
+        handle_types: Blender handle type of each ellipse
+        curve: prepare.Curve to which the closed 4-point beziers should be added to
+        All ellipses are one affine transformation of prepare.ELLIPSE_TEMPLATE.
+        """
+        t = prepare.ELLIPSE_TEMPLATE
+        b = centers[:, None, None, :] + \
+            t[None, :, :, 0, None] * majors[:, None, None, :] + \
+            t[None, :, :, 1, None] * minors[:, None, None, :]
+        b = self.proj_array(b.reshape(-1, 3)).reshape(-1, 3, 4, 3)
+        for spline, handle_type in zip(b, handle_types):
+            curve.bezier(spline[1], spline[0], spline[2], cyclic=True, handle_type=handle_type)
 
-        try:
-            b[0].co = self.proj(vc + r)
-            b[1].co = self.proj(vc + r @ clockwise)
-            b[2].co = self.proj(vc + r @ clockwise @ clockwise)
-            b[3].co = self.proj(vc + r @ clockwise @ clockwise @ clockwise)
-        except:
-            print("Circle center: ", vc, "radius: ", r)
-            raise
+    def circles(self, entities, curve):
+        """
+        entities: list of DXF entities of type `CIRCLE`
+        curve: prepare.Curve to which the circles should be added to
+        """
+        radii = np.array([en.radius for en in entities], dtype=np.float64)
+        zeros = np.zeros_like(radii)
+        majors = np.stack((radii, zeros, zeros), axis=1)
+        minors = np.stack((zeros, -radii, zeros), axis=1)
+        self._ellipse_splines(_array3([en.center for en in entities]), majors, minors, ['AUTO'] * len(radii), curve)
 
-        return c
+    def ellipses(self, entities, curve):
+        """
+        entities: list of DXF entities of type `ELLIPSE` (center, major_axis, ratio)
+        curve: prepare.Curve to which the ellipses should be added to
+        """
+        majors = _array3([en.major_axis for en in entities])
+        ratios = np.array([en.ratio for en in entities], dtype=np.float64)
+        # minor axis: the major axis turned clockwise around z
+        minors = np.stack((majors[:, 1], -majors[:, 0], majors[:, 2]), axis=1) * ratios[:, None]
+        handle_types = ['ALIGNED' if ratio < 1 else 'AUTO' for ratio in ratios]
+        self._ellipse_splines(_array3([en.center for en in entities]), majors, minors, handle_types, curve)
 
-    def scale_controlpoint(self, p, factor):
+    def circle(self, en, curve):
         """
-        p: Blender control-point
-        factor: (Float)
-        Repositions left and right handle of a bezier control point.
+        en: dxf entity
+        curve: prepare.Curve to which the circle should be added to
         """
-        p.handle_left = p.co + (p.handle_left - p.co) * factor
-        p.handle_right = p.co + (p.handle_right - p.co) * factor
+        self.circles([en], curve)
 
     def ellipse(self, en, curve):
         """
-        center: (x,y,z) of circle center
-        major: the ellipse's major direction
-        ratio: ratio between major and minor axis lengths (always < 1)
-        curve: Blender curve data of type "CURVE" (object.data) to which the ellipse should be added to
-        """
-        major = Vector(en.major_axis)
-        en.__dict__["radius"] = major.length
-        c = self.circle(en, curve, major.normalized())
-        b = c.bezier_points
-
-        if en.ratio < 1:
-            for i in range(4):
-                b[i].handle_left_type = 'ALIGNED'
-                b[i].handle_right_type = 'ALIGNED'
-
-            vc = self.proj(en.center)
-            clockwise = Matrix(((0, -1, 0), (1, 0, 0), (0, 0, 1)))
-            if len(major) == 2:
-                major = major.to_3d()
-            minor = major * en.ratio @ clockwise
-
-            lh = b[1].handle_left - b[1].co
-            rh = b[1].handle_right - b[1].co
-            b[1].co = vc + minor
-            b[1].handle_left = b[1].co + lh
-            b[1].handle_right = b[1].co + rh
-            b[3].co = vc + minor @ clockwise @ clockwise
-            b[3].handle_left = b[3].co + rh
-            b[3].handle_right = b[3].co + lh
-
-            self.scale_controlpoint(b[0], en.ratio)
-            self.scale_controlpoint(b[2], en.ratio)
+        en: dxf entity
+        curve: prepare.Curve to which the ellipse should be added to
+        """
+        self.ellipses([en], curve)
 
     def spline(self, en, curve, _3D=True):
         """
         en: DXF entity of type `SPLINE`
-        curve: Blender data structure of type `CURVE`
+        curve: prepare.Curve
         """
         if _3D:
-            curve.dimensions = "3D"
+            curve.is_3d = True
         spline = convert.bspline_to_cubic(self, en, curve, self.errors)
         if spline is None:
             self.errors.add("Not able to import bspline with degree > 3")
@@ -474,7 +615,7 @@ class Do:
     def helix(self, en, curve):
         """
         en: DXF entity of type `HELIX`
-        curve: Blender data structure of type `CURVE`
+        curve: prepare.Curve
         """
         self.spline(en, curve, not en.is_planar)
 
@@ -635,41 +776,64 @@ class Do:
                 obj.location = transformation @ obj.location
                 obj.rotation_euler.rotate(transformation)
 
-    def _bbox(self, objects):
-        xmin = ymin = zmin = float('+inf')
-        xmax = ymax = zmax = float('-inf')
-        bpy.context.view_layer.update()
+    def _local_bounds(self, obj):
+        """
+        Returns the (2, 3) min and max corner of the object data in object space. Curves use the bounds recorded when
+        their prepared arrays were committed, meshes are read with foreach_get, other data (text) uses bound_box;
+        objects without data count as a point. Bounds are cached per datablock, so objects sharing text data only
+        differ by their own matrix in _bbox().
+        """
+        d = obj.data
+        if d is None:
+            return np.zeros((2, 3))
+        bounds = self.bounds.get(d)
+        if bounds is not None:
+            return bounds
+        if obj.type == 'MESH':
+            if len(d.vertices) == 0:
+                return np.zeros((2, 3))
+            co = np.empty(len(d.vertices) * 3, dtype=np.float32)
+            d.vertices.foreach_get("co", co)
+            co = co.reshape(-1, 3)
+            bounds = np.stack((co.min(axis=0), co.max(axis=0)))
+        else:
+            co = np.array(obj.bound_box)
+            if not co.any():
+                # not evaluated (yet), e.g. text in the "Blocks" scene
+                return self._text_bounds(d) if obj.type == 'FONT' else np.zeros((2, 3))
+            bounds = np.stack((co.min(axis=0), co.max(axis=0)))
+        self.bounds[d] = bounds
+        return bounds
 
-        for obj in objects:
-            om = obj.matrix_basis
-            for v in obj.bound_box:
-                p = om @ Vector(v)
-                if p.x < xmin:
-                    xmin = p.x
-                if p.x > xmax:
-                    xmax = p.x
-                if p.y < ymin:
-                    ymin = p.y
-                if p.y > ymax:
-                    ymax = p.y
-                if p.z < zmin:
-                    zmin = p.z
-                if p.z > zmax:
-                    zmax = p.z
-
-        if xmin == float('+inf'):
-            xmin = 0
-        if ymin == float('+inf'):
-            ymin = 0
-        if zmin == float('+inf'):
-            zmin = 0
-        if xmax == float('-inf'):
-            xmax = 0
-        if ymax == float('-inf'):
-            ymax = 0
-        if zmax == float('-inf'):
-            zmax = 0
+    def _text_bounds(self, d):
+        """
+        Rough bounds of unevaluated text data: every character is counted as wide as 0.6 times the text size.
+        """
+        lines = d.body.split("\n") or [""]
+        width = max(len(line) for line in lines) * d.size * 0.6
+        return np.array(((0, -(len(lines) - 1) * d.size, 0), (width, d.size, 0)), dtype=np.float64)
 
+    def _bbox(self, objects):
+        """
+        objects: Blender objects
+        Returns xmin, ymin, zmin, xmax, ymax, zmax of all objects in parent space (all zero for no objects).
+        """
+        objects = list(objects)
+        if len(objects) == 0:
+            return 0, 0, 0, 0, 0, 0
+        # text bounds only exist after an evaluation; one update covers all new text objects
+        if any(o.type == 'FONT' and o.data not in self.bounds and not any(map(any, o.bound_box)) for o in objects):
+            bpy.context.view_layer.update()
+
+        bounds = np.array([self._local_bounds(o) for o in objects])  # (n, 2, 3)
+        matrices = np.array([o.matrix_basis for o in objects])  # (n, 4, 4)
+        # the 8 corners of every box as homogeneous coordinates
+        corners = np.ones((len(objects), 8, 4))
+        for i in range(8):
+            for axis in range(3):
+                corners[:, i, axis] = bounds[:, (i >> axis) & 1, axis]
+        world = np.einsum("nij,nkj->nki", matrices[:, :3], corners).reshape(-1, 3)
+        (xmin, ymin, zmin), (xmax, ymax, zmax) = world.min(axis=0), world.max(axis=0)
         return xmin, ymin, zmin, xmax, ymax, zmax
 
     def _object_bbox(self, objects, name, do_widgets=True):
@@ -702,9 +866,9 @@ class Do:
                         vec = Vector(con.co - point.co) / 10
                         bm.edges.new((point, bm.verts.new(point.co + vec)))
 
-        d = bpy.data.meshes.new(name + "BBOX")
+        d = self._new("meshes", name + "BBOX")
         bm.to_mesh(d)
-        o = bpy.data.objects.new(name, d)
+        o = self._new("objects", name, d)
         return o
 
     def _vertex_duplication(self, x, y, x_count, y_count):
@@ -713,14 +877,14 @@ class Do:
             for j in range(y_count):
                 bm.verts.new(Vector((x * i, y * j, 0.)))
 
-        d = bpy.data.meshes.new("vertex_duplicator")
+        d = self._new("meshes", "vertex_duplicator")
         bm.to_mesh(d)
         return d
 
     def point_object(self, en, scene, name=None):
         if name is None:
             name = en.dxftype
-        o = bpy.data.objects.new("Point", None)
+        o = self._new("objects", "Point", None)
         o.location = self.proj(en.point)
         self._extrusion(o, en)
         scene.collection.objects.link(o)
@@ -738,7 +902,7 @@ class Do:
         if self.import_light:
             type_map = ["NONE", "SUN", "POINT", "SPOT"]
             layer = self.dwg.layers[en.layer]
-            lamp = bpy.data.lights.new(en.name, type_map[en.light_type])
+            lamp = self._new("lights", en.name, type_map[en.light_type])
             if en.color != 256:
                 aci = en.color
             else:
@@ -747,13 +911,33 @@ class Do:
             lamp.color = Color(c.rgb())
             if en.light_type == 3:
                 lamp.spot_size = en.hotspot_angle
-            o = bpy.data.objects.new(en.name, lamp)
+            o = self._new("objects", en.name, lamp)
             o.location = self.proj(en.position)
             dir = self.proj(en.target) - self.proj(en.position)
             o.rotation_quaternion = dir.rotation_difference(Vector((0, 0, -1)))
             scene.collection.objects.link(o)
             return o
 
+    def _shared_text(self, key, create):
+        """
+        key: everything that ends up in the text datablock (type, string, style, height, alignment, ...)
+        create: function that returns a new FONT curve for the key
+        Returns the datablock shared by all texts with the same key; a mesh converted from the font curve once if
+        text_as_mesh is set.
+        """
+        d = self.texts.get(key)
+        if d is None:
+            d = create()
+            if self.text_as_mesh:
+                o = bpy.data.objects.new(d.name, d)
+                m = bpy.data.meshes.new_from_object(o)
+                bpy.data.objects.remove(o)
+                bpy.data.curves.remove(self.manifest["curves"].pop())  # the font curve created last by create()
+                self.manifest["meshes"].append(m)
+                d = m
+            self.texts[key] = d
+        return d
+
     def mtext(self, en, scene, name):
         """
         en: dxf entity
@@ -763,26 +947,31 @@ class Do:
         if self.import_text:
             text = en.plain_text()
             name = text[:8]
-            d = bpy.data.curves.new(name, "FONT")
-            o = bpy.data.objects.new(name, d)
-            d.body = text
-            d.size = en.height
-            if en.rect_width is not None:
-                if en.rect_width > 50:
-                    width = 50
-                    ratio = 50 / en.rect_width
-                    d.size = en.height * ratio * 1.4  # XXX HACK
-                    scale = (1 / ratio, 1 / ratio, 1 / ratio)
-                    d.space_line = en.line_spacing
-                else:
-                    width = en.rect_width
-                    scale = (1, 1, 1)
-                d.text_boxes[0].width = width
-                o.scale = scale
+            ratio = 1
+            if en.rect_width is not None and en.rect_width > 50:
+                ratio = 50 / en.rect_width
+
+            def create():
+                d = self._new("curves", name, "FONT")
+                d.body = text
+                d.size = en.height
+                if en.rect_width is not None:
+                    if en.rect_width > 50:
+                        width = 50
+                        d.size = en.height * ratio * 1.4  # XXX HACK
+                        d.space_line = en.line_spacing
+                    else:
+                        width = en.rect_width
+                    d.text_boxes[0].width = width
 
-            # HACK
-            d.space_line *= 1.5
+                # HACK
+                d.space_line *= 1.5
+                return d
 
+            key = ("MTEXT", text, en.style, en.height, en.rect_width, en.line_spacing, en.attachment_point)
+            o = self._new("objects", name, self._shared_text(key, create))
+            if en.rect_width is not None:
+                o.scale = (1 / ratio, 1 / ratio, 1 / ratio)
             o.rotation_euler = Vector((1, 0, 0)).rotation_difference(en.xdirection).to_euler()
             o.location = en.insert
             return o
@@ -795,20 +984,24 @@ class Do:
         """
         if self.import_text:
             name = en.text[:8]
-            d = bpy.data.curves.new(name, "FONT")
-            d.body = en.plain_text()
-            d.size = en.height
-            o = bpy.data.objects.new(name, d)
+            et = en.thickness / 2 if hasattr(en, "thickness") else 0
+
+            def create():
+                d = self._new("curves", name, "FONT")
+                d.body = en.plain_text()
+                d.size = en.height
+                d.extrude = abs(et)
+                return d
+
+            key = ("TEXT", en.plain_text(), en.style, en.height, et, en.halign, en.valign)
+            o = self._new("objects", name, self._shared_text(key, create))
             o.rotation_euler = Euler((0, 0, radians(en.rotation)), 'XYZ')
             basepoint = self.proj(en.basepoint) if hasattr(en, "basepoint") else self.proj((0, 0, 0))
             o.location = self.proj((en.insert)) + basepoint
-            if hasattr(en, "thickness"):
-                et = en.thickness / 2
-                d.extrude = abs(et)
-                if et > 0:
-                    o.location.z += et
-                elif et < 0:
-                    o.location.z -= et
+            if et > 0:
+                o.location.z += et
+            elif et < 0:
+                o.location.z -= et
             return o
 
     def block_linked_object(self, entity, scene, name=None, override_group=None, invisible=None, recursion_level=0):
@@ -825,7 +1018,7 @@ class Do:
         """
         def _recursive_copy_inserts(parent, known_inserts, inserts, group, invisible):
             for ki in known_inserts:
-                new_insert = ki.copy()
+                new_insert = self._copy(ki)
                 _recursive_copy_inserts(new_insert, ki.children, None, group, invisible)
                 if new_insert.name not in group.objects:
                     group.objects.link(new_insert)
@@ -863,8 +1056,10 @@ class Do:
             insert_bounding_boxes = []
             for INSERT in block_inserts:
                 insert = self.insert(INSERT, scene, None, group, invisible, recursion_level + 1)
+                if insert is None:
+                    continue
                 if len(insert.children) > 0:
-                    i_copy = bpy.data.objects.new(insert.name, None)
+                    i_copy = self._new("objects", insert.name, None)
                     i_copy.matrix_basis = insert.matrix_basis
                     scene.collection.objects.link(i_copy)
                     group.objects.link(i_copy)
@@ -882,7 +1077,7 @@ class Do:
                     o = self._object_bbox(objects + insert_bounding_boxes, name, recursion_level == 0)
                     scene.collection.objects.link(o)
                 else:
-                    o = bpy.data.objects.new(name, None)
+                    o = self._new("objects", name, None)
                     scene.collection.objects.link(o)
                 if len(objects) > 0:
                     for obj in objects:
@@ -892,7 +1087,7 @@ class Do:
                 o = objects.pop(0)
             else:
                 # strange case but possible according to the testfiles
-                o = bpy.data.objects.new(name, None)
+                o = self._new("objects", name, None)
                 scene.collection.objects.link(o)
 
             # unlink bounding boxes of inserts
@@ -907,21 +1102,21 @@ class Do:
 
             # put a copy of the retrieved objects into the known_blocks dict, so that the attributes being added to
             # the object from this point onwards (from INSERT attributes) are not being copied to new/other INSERTs
-            self.known_blocks[name] = [[o.copy() for o in objects], inserts]
+            self.known_blocks[name] = [[self._copy(o) for o in objects], inserts]
 
             # so that it gets assigned to the group and inherits visibility too
             objects.append(o)
 
-            self.known_blocks[name].append(o.copy())
+            self.known_blocks[name].append(self._copy(o))
         else:
             known_objects, known_inserts, known_o = self.known_blocks[name]
 
             for known_object in known_objects:
-                oc = known_object.copy()
+                oc = self._copy(known_object)
                 scene.collection.objects.link(oc)
                 objects.append(oc)
 
-            o = known_o.copy()
+            o = self._copy(known_o)
             scene.collection.objects.link(o)
 
             _recursive_copy_inserts(o, known_inserts, inserts, group, invisible)
@@ -942,9 +1137,7 @@ class Do:
             for obj in objects:
                 obj.hide_viewport = bool(invisible)
 
-        # block transformations
-        o.location = self.proj(entity.basepoint)
-
+        # the INSERT transformation, including the base point offset, is applied by insert()
         return o
 
     def block_group_instances(self, entity, scene, name=None, override_group=None, invisible=None, recursion_level=0):
@@ -959,11 +1152,7 @@ class Do:
             group = self._get_group(entity.layer)
 
         block_group = self._get_group(entity.name+"_BLOCK")
-
-        if "Blocks" not in bpy.data.scenes:
-            block_scene = bpy.data.scenes.new("Blocks")
-        else:
-            block_scene = bpy.data.scenes["Blocks"]
+        block_scene = self._block_scene()
 
         # create the block
         if len(block_group.objects) == 0 or name not in self.known_blocks.keys():
@@ -984,7 +1173,8 @@ class Do:
             inserts = []
             for INSERT in block_inserts:
                 i = self.insert(INSERT, block_scene, None, block_group, invisible, recursion_level + 1, True)
-                inserts.append(i)
+                if i is not None:
+                    inserts.append(i)
 
             bbox = self._object_bbox(objects + inserts, name, True)
 
@@ -992,7 +1182,7 @@ class Do:
                 sub_group = i.instance_collection
                 block_scene.collection.objects.unlink(i)
                 block_group.objects.unlink(i)
-                i_empty = bpy.data.objects.new(i.name, None)
+                i_empty = self._new("objects", i.name, None)
                 i_empty.matrix_basis = i.matrix_basis
                 i_empty.instance_type = "COLLECTION"
                 i_empty.instance_collection = sub_group
@@ -1004,19 +1194,247 @@ class Do:
             bbox = self.known_blocks[name][2]
 
         bpy.context.screen.scene = scene
-        o = bbox.copy()
+        o = self._copy(bbox)
         # o.empty_display_size = 0.3
         o.instance_type = "COLLECTION"
         o.instance_collection = block_group
         group.objects.link(o)
         if invisible is not None:
             o.hide_viewport = invisible
-        o.location = self.proj(entity.basepoint)
         scene.collection.objects.link(o)
         # block_scene.view_layers[0].update()
 
         return o
 
+    def _block_scene(self):
+        """
+        Returns the scene that holds the geometry of instanced blocks.
+        """
+        if "Blocks" not in bpy.data.scenes:
+            return self._new("scenes", "Blocks")
+        return bpy.data.scenes["Blocks"]
+
+    def _block_collection(self, name):
+        """
+        name: name of a DXF block
+        Returns the collection of a block definition; it is built only once per import. The geometry of the block
+        lives in the "Blocks" scene and nested INSERTs become collection-instance empties inside the collection.
+        """
+        collection = self.known_blocks.get(name)
+        if collection is not None:
+            return collection
+
+        self.did_group_instance = True
+        block = self.dwg.blocks[name]
+        block_scene = self._block_scene()
+        collection = self._new("collections", "BL|" + name)
+        collection.instance_offset = self.proj(block.basepoint)
+        self.known_blocks[name] = collection
+        self.block_chain.append(name)
+
+        if self.combination != SEPARATED:
+            self.combined_objects((en for en in block if is_.combined_entity(en)), block_scene, "BL|" + name,
+                                  collection)
+            bs = (en for en in block if is_.separated_entity(en) and not is_.insert(en.dxftype))
+        else:
+            bs = (en for en in block if (is_.combined_entity(en) or is_.separated_entity(en)) and
+                  not is_.insert(en.dxftype))
+        self.separated_entities(bs, block_scene, "BL|" + name, collection)
+
+        for INSERT in (en for en in block if is_.insert(en.dxftype)):
+            # like _block_paths(): an INSERT of a block on the current chain would be a collection instancing cycle
+            if INSERT.name in self.block_chain:
+                self.errors.add("DXF-Import: block '%s' inserts itself." % INSERT.name)
+                continue
+            if INSERT.name not in self.dwg.blocks:
+                continue
+            for o in self._collection_instances(INSERT):
+                collection.objects.link(o)
+
+        self.block_chain.pop()
+        return collection
+
+    def _collection_instances(self, entity):
+        """
+        entity: DXF entity of type `INSERT`
+        Returns a list of new objects; the first one carries the INSERT transformation and is either the
+        collection-instance empty or, for INSERTs with rows and columns, the parent of one instance per cell.
+        """
+        def _instance(collection):
+            o = self._new("objects", entity.name, None)
+            o.instance_type = "COLLECTION"
+            o.instance_collection = collection
+            o.hide_viewport = bool(entity.invisible)
+            return o
+
+        collection = self._block_collection(entity.name)
+        rows = max(entity.row_count, 1)
+        cols = max(entity.col_count, 1)
+
+        if rows * cols > 1:
+            objects = [self._new("objects", entity.name, None)]
+            # row and column spacing is not affected by the INSERT's scale
+            sx, sy = (s if s != 0 else 1 for s in entity.scale[:2])
+            u = self.dxf_unit_scale
+            for row in range(rows):
+                for col in range(cols):
+                    o = _instance(collection)
+                    o.location = (col * entity.col_spacing * u / sx, row * entity.row_spacing * u / sy, 0)
+                    o.parent = objects[0]
+                    objects.append(o)
+        else:
+            objects = [_instance(collection)]
+
+        o = objects[0]
+        aunits = self.aunits
+        o.location = self.proj(entity.insert)
+        o.rotation_euler = Euler((0, 0, radians(entity.rotation) if aunits == 0 else entity.rotation))
+        o.scale = entity.scale
+        self._extrusion(o, entity)
+        o.hide_viewport = bool(entity.invisible)
+        return objects
+
+    def _insert_matrices(self, entity):
+        """
+        entity: DXF entity of type `INSERT`
+        Returns one 4x4 matrix per row/column cell as a (cells, 4, 4) array; each maps the inserted block, relative to
+        its base point, into the coordinates of the block or drawing that contains the INSERT.
+        """
+        rows = max(entity.row_count, 1)
+        cols = max(entity.col_count, 1)
+        u = self.dxf_unit_scale
+        rotation = radians(entity.rotation) if self.aunits == 0 else entity.rotation
+        head = Matrix.Translation(self.proj(entity.insert)) @ Matrix.Rotation(rotation, 4, "Z")
+        if is_.extrusion(entity):
+            head = convert.extrusion_to_matrix(entity) @ head
+        tail = Matrix.Diagonal(Vector(entity.scale)).to_4x4() @ \
+            Matrix.Translation(-self.proj(self.dwg.blocks[entity.name].basepoint))
+
+        # row and column spacing is not affected by the INSERT's scale
+        cells = np.tile(np.eye(4), (rows * cols, 1, 1))
+        cells[:, 0, 3] = np.tile(np.arange(cols), rows) * entity.col_spacing * u
+        cells[:, 1, 3] = np.repeat(np.arange(rows), cols) * entity.row_spacing * u
+        return np.array(head) @ cells @ np.array(tail)
+
+    def _block_inserts(self, name):
+        """
+        name: name of a DXF block
+        Returns [(block name, (cells, 4, 4) matrices)] for the INSERTs in the block; memoized per block.
+        """
+        inserts = self.block_inserts.get(name)
+        if inserts is None:
+            inserts = []
+            for INSERT in (en for en in self.dwg.blocks[name] if is_.insert(en.dxftype)):
+                if INSERT.name not in self.dwg.blocks:
+                    if not (self.anonymous_blocks == "skip" and INSERT.name.startswith("*")):
+                        self.errors.add("DXF-Import: block '%s' is not defined." % INSERT.name)
+                    continue
+                inserts.append((INSERT.name, self._insert_matrices(INSERT)))
+            self.block_inserts[name] = inserts
+        return inserts
+
+    def _block_paths(self, name):
+        """
+        name: name of a DXF block
+        Returns {block name: (k, 4, 4) matrices} with one matrix for each path through nested INSERTs that leads from
+        block `name` to a block, relative to the base point of `name`; memoized per block. The traversal keeps its own
+        stack, so deeply nested blocks do not hit the recursion limit, and composes the matrices of all cells at once.
+        """
+        paths = self.block_paths.get(name)
+        if paths is not None:
+            return paths
+
+        collected = {}
+        start = np.array(Matrix.Translation(-self.proj(self.dwg.blocks[name].basepoint)))[None]
+        stack = [(name, start, (name,))]
+        while stack:
+            block_name, matrices, chain = stack.pop()
+            collected.setdefault(block_name, []).append(matrices)
+            for child, local in self._block_inserts(block_name):
+                if child in chain:
+                    self.errors.add("DXF-Import: block '%s' inserts itself." % child)
+                    continue
+                composed = (matrices[:, None] @ local[None]).reshape(-1, 4, 4)
+                stack.append((child, composed, chain + (child,)))
+
+        paths = {block_name: np.concatenate(matrices) for block_name, matrices in collected.items()}
+        self.block_paths[name] = paths
+        return paths
+
+    def _block_templates(self, name):
+        """
+        name: name of a DXF block
+        Returns the objects holding the geometry of the block without its nested INSERTs. They are built once per import
+        in the "Blocks" scene; every insert path gets a copy that shares their data.
+        """
+        templates = self.block_templates.get(name)
+        if templates is not None:
+            return templates
+
+        if self.template_group is None:
+            self.template_group = self._new("collections", "BLOCK_TEMPLATES")
+        block = self.dwg.blocks[name]
+        block_scene = self._block_scene()
+        templates = []
+        if self.combination != SEPARATED:
+            templates += self.combined_objects((en for en in block if is_.combined_entity(en)), block_scene,
+                                               "BL|" + name, self.template_group)
+            bs = (en for en in block if is_.separated_entity(en) and not is_.insert(en.dxftype))
+        else:
+            bs = (en for en in block if (is_.combined_entity(en) or is_.separated_entity(en)) and
+                  not is_.insert(en.dxftype))
+        templates += self.separated_entities(bs, block_scene, "BL|" + name, self.template_group)
+        self.block_templates[name] = templates
+        return templates
+
+    def _expanded_insert(self, entity, scene, group):
+        """
+        entity: DXF entity of type `INSERT` whose block contains INSERTs
+        Returns an empty that has one copy of the geometry of every block reached through nested INSERTs per path as
+        children; only the composed matrices differ between the copies. The INSERT transformation itself is applied
+        to the empty by insert().
+        """
+        root = self._new("objects", entity.name, None)
+        scene.collection.objects.link(root)
+        group.objects.link(root)
+
+        def _place(template, matrices, first=None):
+            # first: a new object that takes the place of the first copy
+            for i, m in enumerate(matrices @ np.array(template.matrix_basis)):
+                o = first if i == 0 and first is not None else self._copy(template)
+                o.matrix_basis = Matrix(m.tolist())
+                o.parent = root
+                scene.collection.objects.link(o)
+                group.objects.link(o)
+
+        for block_name, matrices in self._block_paths(entity.name).items():
+            for template in self._block_templates(block_name):
+                _place(template, matrices)
+
+            # ATTRIBs of the nested INSERTs become text objects like in _insert_attributes(), placed along the same
+            # paths as the geometry of the block that contains the INSERT
+            if not self.import_text:
+                continue
+            for INSERT in self.dwg.blocks[block_name]:
+                if not is_.insert(INSERT.dxftype) or not INSERT.attribsfollow:
+                    continue
+                for a in INSERT.attribs:
+                    t = self.text(a, scene, None)
+                    _place(t, matrices, t)
+        return root
+
+    def _insert_attributes(self, o, entity, scene):
+        """
+        Stores the ATTRIBs of an INSERT as custom properties of o and adds them as text objects.
+        """
+        if self.import_text:
+            if entity.attribsfollow:
+                for a in entity.attribs:
+                    # Blender custom property
+                    o[a.tag] = a.text
+                    attname = entity.name + "_" + a.tag
+                    scene.collection.objects.link(self.text(a, scene, attname))
+
     def insert(self, entity, scene, name, group=None, invisible=None, recursion_level=0, need_group_inst=None):
         """
         entity: DXF entity
@@ -1024,7 +1442,27 @@ class Do:
         group: Blender group of type (bpy_types.Collection) being set if called from block()
         invisible: boolean to control visibility; being set if called from block()
         """
-        aunits = self.dwg.header.get('$AUNITS', 0)
+        aunits = self.aunits
+
+        if entity.name not in self.dwg.blocks:
+            if not (self.anonymous_blocks == "skip" and entity.name.startswith("*")):
+                self.errors.add("DXF-Import: block '%s' is not defined." % entity.name)
+            return None
+
+        if group is None:
+            group = self._get_group(entity.layer)
+
+        # anonymous blocks are imported as plain geometry without any block representation
+        flatten = self.anonymous_blocks == "flatten" and \
+            (entity.name.startswith("*") or self.dwg.blocks[entity.name].is_anonymous)
+
+        if self.block_representation == COLLECTION_INSTANCES and not flatten:
+            objects = self._collection_instances(entity)
+            for o in objects[1:]:
+                scene.collection.objects.link(o)
+                group.objects.link(o)
+            self._insert_attributes(objects[0], entity, scene)
+            return objects[0]
 
         # check if group instances are needed
         kids = sum(1 for i in self.dwg.blocks[entity.name] if i.dxftype == "INSERT")
@@ -1036,15 +1474,21 @@ class Do:
             need_group_inst = (entity.row_count or entity.col_count) > 1 and \
                               (kids > 0 or objtypes > 1 or sep > 1 or (objtypes > 0 and sep > 0))
 
-        if group is None:
-            group = self._get_group(entity.layer)
-
-        if self.block_representation == GROUP_INSTANCES or need_group_inst:
+        # every representation maps block point p to insert + R·S·(p - basepoint), like the collection instances and
+        # the matrices of _insert_matrices(); expanded inserts already start their paths at the base point
+        base_offset = Vector((0, 0, 0))
+        if flatten:
+            o = self._expanded_insert(entity, scene, group)
+        elif self.block_representation == GROUP_INSTANCES or need_group_inst:
             o = self.block_group_instances(self.dwg.blocks[entity.name], scene, entity.name, group,
                                            entity.invisible, recursion_level)
+            base_offset = -self.proj(self.dwg.blocks[entity.name].basepoint)
+        elif kids > 0:
+            o = self._expanded_insert(entity, scene, group)
         else:
             o = self.block_linked_object(self.dwg.blocks[entity.name], scene, entity.name, group,
                                          entity.invisible, recursion_level)
+            base_offset = -self.proj(self.dwg.blocks[entity.name].basepoint)
 
         # column & row
         if (entity.row_count or entity.col_count) > 1:
@@ -1064,15 +1508,18 @@ class Do:
                 y = (Vector(o.bound_box[3]) - Vector(o.bound_box[0])).length
                 dm = self._vertex_duplication(x * entity.col_spacing / 2, y * entity.row_spacing,
                                               entity.col_count, entity.row_count)
-                o = bpy.data.objects.new(entity.name, dm)
+                o = self._new("objects", entity.name, dm)
                 instance.parent = o
+                instance.location = base_offset
+                base_offset = Vector((0, 0, 0))
                 o.instance_type = "VERTS"
 
         # insert transformations
         rot = radians(entity.rotation) if aunits == 0 else entity.rotation
-        o.location += self.proj(entity.insert)
         o.rotation_euler = Euler((0, 0, rot))
         o.scale = entity.scale
+        o.location = self.proj(entity.insert) + \
+            o.rotation_euler.to_matrix() @ (Matrix.Diagonal(Vector(entity.scale)) @ base_offset)
 
         # mirror (extrusion value of an INSERT ENTITY)
         self._extrusion(o, entity)
@@ -1084,13 +1531,7 @@ class Do:
             o.hide_viewport = bool(invisible)
 
         # attributes
-        if self.import_text:
-            if entity.attribsfollow:
-                for a in entity.attribs:
-                    # Blender custom property
-                    o[a.tag] = a.text
-                    attname = entity.name + "_" + a.tag
-                    scene.collection.objects.link(self.text(a, scene, attname))
+        self._insert_attributes(o, entity, scene)
 
         return o
 
@@ -1098,24 +1539,16 @@ class Do:
     # type(self, dxf entities, object name string)
     #     returns blender object
 
-    def _check3D_object(self, curve):
-        """
-        Checks if a curve object has coordinates that are elevated from the z-plane.
-        If so the curve.dimensions are set to 3D.
-        """
-        if any((p.co.z != 0 for spline in curve.splines for p in spline.points)) or \
-           any((p.co.z != 0 for spline in curve.splines for p in spline.bezier_points)):
-            curve.dimensions = '3D'
-
     def _merge_lines(self, lines, curve):
         """
         lines: list of LINE entities
-        curve: Blender curve data
+        curve: prepare.Curve
         merges a list of LINE entities to a polygon-point-list and adds it to the Blender curve
         """
         polylines = line_merger(lines)
-        for polyline in polylines:
-            self._poly(polyline, curve, 0, polyline[0] == polyline[-1])
+        if len(polylines) > 0:
+            self._polys(polylines, [polyline[0] == polyline[-1] for polyline in polylines], [0] * len(polylines),
+                        curve)
 
     def _thickness(self, bm, thickness):
         """
@@ -1161,41 +1594,16 @@ class Do:
             obj.data.twist_mode = "Z_UP"
 
         else:
-            # CURVE BEVEL
             ew = entity.width
             max_w = max((w for w_pair in ew for w in w_pair))
+            taper_widths = None
+            if has_varying_width and len(ew) == 1:
+                taper_widths = (ew[0][0] / max_w, ew[0][1] / max_w)
 
-            bevd = bpy.data.curves.new("BEVEL", "CURVE")
-            bevdp = bevd.splines.new("POLY")
-            bevdp.points.add(1)
-            bevdp.points[0].co = Vector((-max_w / 2, 0, 0, 0))
-            bevdp.points[1].co = Vector((max_w / 2, 0, 0, 0))
-
-            bevel = bpy.data.objects.new("BEVEL", bevd)
+            bevel, taper = self._width_profile(max_w, taper_widths, scene)
             obj.data.bevel_object = bevel
-            scene.collection.objects.link(bevel)
-
-            # CURVE TAPER
-            if has_varying_width and len(ew) == 1:
-                tapd = bpy.data.curves.new("TAPER", "CURVE")
-                tapdp = tapd.splines.new("POLY")
-                # lenlist = convert.bulgepoly_to_lenlist(entity)
-                # amount = len(ew) if entity.is_closed else len(ew) - 1
-
-                tapdp.points[0].co = Vector((0, ew[0][0] / max_w, 0, 0))
-                tapdp.points.add(1)
-                tapdp.points[1].co = Vector((1, ew[0][1] / max_w, 0, 0))
-
-                # for i in range(1, amount):
-                #     start_w = ew[i][0]
-                #     end_w = ew[i][1]
-                #     tapdp.points.add(2)
-                #     tapdp.points[-2].co = Vector((sum(lenlist[:i]), start_w / max_w, 0, 0))
-                #     tapdp.points[-1].co = Vector((sum(lenlist[:i + 1]), end_w / max_w, 0, 0))
-
-                taper = bpy.data.objects.new("TAPER", tapd)
+            if taper is not None:
                 obj.data.taper_object = taper
-                scene.collection.objects.link(taper)
 
             # THICKNESS FOR CURVES HAVING A WIDTH
             if th != 0:
@@ -1205,9 +1613,62 @@ class Do:
                 solidify.offset = 1
                 solidify.show_expanded = False
 
-            # make the shading look good
-            esp = obj.modifiers.new("EdgeSplit", "EDGE_SPLIT")
-            esp.show_expanded = False
+                # make the shading look good; a flat band has no edges that need splitting
+                esp = obj.modifiers.new("EdgeSplit", "EDGE_SPLIT")
+                esp.show_expanded = False
+
+    def _width_profile(self, max_w, taper_widths, scene):
+        """
+        max_w: full width of the curve
+        taper_widths: (start, end) width relative to max_w or None for a constant width
+        Returns the (bevel, taper) objects for the width; taper is None for a constant width. The objects are shared
+        between all curves with the same widths and kept in a hidden utility collection.
+        """
+        key = (max_w, taper_widths)
+        profile = self.profiles.get(key)
+        if profile is not None:
+            return profile
+
+        if self.profile_collection is None:
+            self.profile_collection = self._new("collections", "DXF_PROFILES")
+            self.profile_collection.hide_viewport = True
+            self.profile_collection.hide_render = True
+            scene.collection.children.link(self.profile_collection)
+
+        # CURVE BEVEL
+        bevd = self._new("curves", "BEVEL", "CURVE")
+        bevdp = bevd.splines.new("POLY")
+        bevdp.points.add(1)
+        bevdp.points[0].co = Vector((-max_w / 2, 0, 0, 0))
+        bevdp.points[1].co = Vector((max_w / 2, 0, 0, 0))
+
+        bevel = self._new("objects", "BEVEL", bevd)
+        self.profile_collection.objects.link(bevel)
+
+        # CURVE TAPER
+        taper = None
+        if taper_widths is not None:
+            tapd = self._new("curves", "TAPER", "CURVE")
+            tapdp = tapd.splines.new("POLY")
+            # lenlist = convert.bulgepoly_to_lenlist(entity)
+            # amount = len(ew) if entity.is_closed else len(ew) - 1
+
+            tapdp.points[0].co = Vector((0, taper_widths[0], 0, 0))
+            tapdp.points.add(1)
+            tapdp.points[1].co = Vector((1, taper_widths[1], 0, 0))
+
+            # for i in range(1, amount):
+            #     start_w = ew[i][0]
+            #     end_w = ew[i][1]
+            #     tapdp.points.add(2)
+            #     tapdp.points[-2].co = Vector((sum(lenlist[:i]), start_w / max_w, 0, 0))
+            #     tapdp.points[-1].co = Vector((sum(lenlist[:i + 1]), end_w / max_w, 0, 0))
+
+            taper = self._new("objects", "TAPER", tapd)
+            self.profile_collection.objects.link(taper)
+
+        self.profiles[key] = (bevel, taper)
+        return bevel, taper
 
     def _subdivision(self, obj, entity):
         if entity.subdivision_levels > 0:
@@ -1216,7 +1677,7 @@ class Do:
             subd.show_expanded = False
 
     def polys_to_mesh(self, entities, scene, name):
-        d = bpy.data.meshes.new(name)
+        d = self._new("meshes", name)
         bm = bmesh.new()
         m = Matrix(((1, 0, 0, 0), (0, 1, 0, 0), (0, 0, 1, 0), (0, 0, 0, 1)))
         for en in entities:
@@ -1232,7 +1693,7 @@ class Do:
                 bm.edges.new(verts)
 
         bm.to_mesh(d)
-        o = bpy.data.objects.new(name, d)
+        o = self._new("objects", name, d)
         scene.collection.objects.link(o)
         return o
 
@@ -1242,7 +1703,7 @@ class Do:
         name: name of the returned Blender object (String)
         Accumulates all entities into a Blender bmesh and returns a Blender object containing it.
         """
-        d = bpy.data.meshes.new(name)
+        d = self._new("meshes", name)
         bm = bmesh.new()
 
         i = 0
@@ -1261,7 +1722,7 @@ class Do:
                 if en.thickness != 0:
                     self._thickness(bm, en.thickness)
             bm.to_mesh(d)
-            o = bpy.data.objects.new(name, d)
+            o = self._new("objects", name, d)
             # for POLYFACE
             if hasattr(en, "extrusion"):
                 self._extrusion(o, en)
@@ -1270,36 +1731,131 @@ class Do:
             return o
         return None
 
-    def object_curve(self, entities, scene, name):
+    def prepare_curve(self, entities):
         """
         entities: list of DXF entities
-        name: name of the returned Blender object (String)
-        Accumulates all entities in the list into a Blender curve and returns a Blender object containing it.
+        Preparation stage of object_curve(): accumulates all entities into a prepare.Curve without touching bpy, so
+        that it can run in a worker thread. Returns None for an empty list.
         """
-        d = bpy.data.curves.new(name, "CURVE")
+        curve = prepare.Curve()
 
-        i = 0
         lines = []
+        # arcs, circles, ellipses and bulged polylines are converted in one vectorized batch per type
+        batched = {"ARC": [], "CIRCLE": [], "ELLIPSE": []}
+        bulged = []
+        plain = {}  # dxftype: polylines without bulges; one type per batch keeps 2d and 3d vertices apart
         for en in entities:
-            i += 1
+            curve.entity = en
             TYPE = en.dxftype
             if TYPE == "LINE" and self.merge_lines:
                 lines.append(en)
                 continue
+            if TYPE in batched:
+                batched[TYPE].append(en)
+                continue
+            if TYPE in _BULGE_POLYS:
+                if any(en.bulge):
+                    bulged.append(en)
+                elif len(en.points) > 0:
+                    plain.setdefault(TYPE, []).append(en)
+                continue
             typefunc = getattr(self, TYPE.lower(), None)
             if typefunc is not None:
-                typefunc(en, d)
+                typefunc(en, curve)
             else:
                 self.errors.add(en.dxftype.lower() + " - unknown dxftype")
 
         if len(lines) > 0:
-            self._merge_lines(lines, d)
+            self._merge_lines(lines, curve)
+        if len(batched["ARC"]) > 0:
+            self.arcs(batched["ARC"], curve)
+        if len(batched["CIRCLE"]) > 0:
+            self.circles(batched["CIRCLE"], curve)
+        if len(batched["ELLIPSE"]) > 0:
+            self.ellipses(batched["ELLIPSE"], curve)
+        if len(bulged) > 0:
+            self.bulge_polys(bulged, curve)
+        for polys in plain.values():
+            self.polys(polys, curve)
+
+        if curve.entity is None:
+            return None
+        curve.check_3d()
+        if self.curves_as_edges:
+            curve.edges = prepare.tessellate(curve, self.chord_tolerance)
+        return curve
+
+    def _commit_curve(self, curve, name):
+        """
+        curve: prepare.Curve
+        name: name of the returned Blender curve data (String)
+        Commit stage of object_curve(): creates the Blender curve data from the prepared arrays.
+        """
+        d = self._new("curves", name, "CURVE")
+        for spline in curve.splines:
+            count = len(spline)
+            if spline.kind == "POLY":
+                p = d.splines.new("POLY")
+                p.use_smooth = False
+                p.use_cyclic_u = spline.cyclic
+                p.points.add(count - 1)
+                co = np.ones((count, 4), dtype=np.float32)
+                co[:, :3] = spline.co
+                p.points.foreach_set("co", co.ravel())
+            else:
+                c = d.splines.new("BEZIER")
+                c.use_cyclic_u = spline.cyclic
+                b = c.bezier_points
+                b.add(count - 1)
+                if spline.handle_type is not None:
+                    for bp in b:
+                        bp.handle_left_type = spline.handle_type
+                        bp.handle_right_type = spline.handle_type
+                b.foreach_set("co", spline.co.astype(np.float32).ravel())
+                b.foreach_set("handle_left", spline.handle_left.astype(np.float32).ravel())
+                b.foreach_set("handle_right", spline.handle_right.astype(np.float32).ravel())
+
+        if curve.is_3d:
+            d.dimensions = '3D'
+        return d
 
-        if i > 0:
-            self._check3D_object(d)
-            o = bpy.data.objects.new(name, d)
-            self._thickness_and_width(o, en, scene)
-            self._extrusion(o, en)
+    def _commit_edges(self, curve, name):
+        """
+        curve: prepare.Curve with tessellated edges
+        name: name of the returned Blender mesh data (String)
+        Commit stage of object_curve() if curves_as_edges is set: creates an edge-only mesh.
+        """
+        verts, edges = curve.edges
+        d = self._new("meshes", name)
+        d.vertices.add(len(verts))
+        d.edges.add(len(edges))
+        d.vertices.foreach_set("co", verts.astype(np.float32).ravel())
+        d.edges.foreach_set("vertices", edges.astype(np.int32).ravel())
+        d.update()
+        return d
+
+    def object_curve(self, entities, scene, name, prepared=None):
+        """
+        entities: list of DXF entities
+        name: name of the returned Blender object (String)
+        prepared: optional; result of prepare_curve(entities) if it already ran in a worker thread
+        Accumulates all entities in the list into a Blender curve and returns a Blender object containing it. If
+        curves_as_edges is set, the object contains an edge-only mesh instead and has no thickness or width.
+        """
+        if prepared is None:
+            prepared = self.prepare_curve(entities)
+
+        if prepared is not None:
+            self.removed_vertices += prepared.removed
+            if prepared.edges is not None:
+                d = self._commit_edges(prepared, name)
+            else:
+                d = self._commit_curve(prepared, name)
+            self.bounds[d] = prepared.bounds()
+            o = self._new("objects", name, d)
+            if prepared.edges is None:
+                self._thickness_and_width(o, prepared.entity, scene)
+            self._extrusion(o, prepared.entity)
             return o
 
         return None
@@ -1346,16 +1902,17 @@ class Do:
         if name in groups.keys():
             group = groups[name]
         else:
-            group = bpy.data.collections.new(name)
+            group = self._new("collections", name)
         return group
 
-    def _call_object_types(self, TYPE, entities, group, name, scene, separated=False):
+    def _call_object_types(self, TYPE, entities, group, name, scene, separated=False, prepared=None):
         """
         TYPE: DXF type
         entities: list of DXF entities
         group: Blender group (type: bpy_types.Group)
         name: name of the object that is being created and returned (String)
         separated: flag to make _call_types uniformly available for combined_objects() and separated_objects()
+        prepared: optional; prepare.Curve from the preparation stage of a curve group
         """
         if separated:
             entity = entities[0]
@@ -1364,7 +1921,9 @@ class Do:
 
         # call merged geometry methods
 
-        if TYPE is True:  # TYPE == True == is_.closed_poly_no_bulge for all entities
+        if prepared is not None:
+            o = self.object_curve(entities, scene, name, prepared)
+        elif TYPE is True:  # TYPE == True == is_.closed_poly_no_bulge for all entities
             o = self.polys_to_mesh(entities, scene, name)
         elif is_.mesh(TYPE):
             o = self.object_mesh(entities, scene, name)
@@ -1396,24 +1955,40 @@ class Do:
                 group.objects.link(o)
         return o
 
-    def _recenter(self, scene, name):
-        bpy.context.screen.scene = scene
-        bpy.context.view_layer.update()
-        bpy.ops.object.select_all(action='DESELECT')
+    def _origin_to_cursor(self, o, cursor):
+        """
+        Moves the origin of o to the cursor without moving its geometry; like bpy.ops.object.origin_set(type=
+        'ORIGIN_CURSOR') it leaves empties and objects with shared data untouched.
+        """
+        d = o.data
+        if d is None or d.users > 1 or not hasattr(d, "transform"):
+            return
+        m = o.matrix_basis.copy()
+        moved = Matrix.Translation(cursor - m.translation) @ m
+        compensation = moved.inverted() @ m
+        d.transform(compensation)
+        self.bounds.pop(d, None)
+        o.matrix_basis = moved
+        # keep the children where they are
+        for child in o.children:
+            child.matrix_parent_inverse = compensation @ child.matrix_parent_inverse
 
-        recenter_objects = (o for o in scene.objects if "BEVEL" not in o.name and "TAPER" not in o.name
-                            and o not in self.objects_before)
-        xmin, ymin, zmin, xmax, ymax, zmax = self._bbox(recenter_objects)
+    def _recenter(self, scene, name):
+        imported = [o for o in self.manifest["objects"] if "BEVEL" not in o.name and "TAPER" not in o.name
+                    and scene in o.users_scene]
+        xmin, ymin, zmin, xmax, ymax, zmax = self._bbox(imported)
         vmin = Vector((xmin, ymin, zmin))
         vmax = Vector((xmax, ymax, zmax))
         center = vmin + (vmax - vmin) / 2
-        for o in (o for o in scene.objects if "BEVEL" not in o.name and "TAPER" not in o.name
-                  and o not in self.objects_before and o.parent is None):
-            o.location = o.location - center
-            o.select_set(True)
+
+        roots = [o for o in imported if o.parent is None]
+        for o in roots:
+            o.location -= center
 
         if not self.did_group_instance:
-            bpy.ops.object.origin_set(type='ORIGIN_CURSOR')
+            cursor = scene.cursor.location.copy()
+            for o in roots:
+                self._origin_to_cursor(o, cursor)
 
         if self.pDXF is not None:
             self.georeference(scene, center)
@@ -1430,7 +2005,7 @@ class Do:
           insert, keep appending children to the children.
         - Any subsequent inserts in the list are represented just by a face in the duplicator object.
         """
-        aunits = self.dwg.header.get('$AUNITS', 0)
+        aunits = self.aunits
         f = 20
         base = [
             Vector(( sqrt(((1/f)**2))/2, sqrt(((1/f)**2))/2,0)),
@@ -1459,9 +2034,9 @@ class Do:
 
 
 
-        m = bpy.data.meshes.new(blockname+"_geometry")
+        m = self._new("meshes", blockname+"_geometry")
         bm.to_mesh(m)
-        o = bpy.data.objects.new(blockname, m)
+        o = self._new("objects", blockname, m)
         o.location = location
         scene.collection.objects.link(o)
 
@@ -1471,19 +2046,30 @@ class Do:
         o.instance_faces_scale = f
 
     def _nest_block(self, parent, name, blgroup, scene):
-        b = self.dwg.blocks[name]
-        e = bpy.data.objects.new(name, None)
-        scene.collection.objects.link(e)
-        #e.location = parent.location
-        e.parent = parent
-        for TYPE, grouped in groupsort.by_dxftype(b):
-            if TYPE == "INSERT":
-                for en in grouped:
-                    self._nest_block(e, en.name, blgroup, scene)
-            else:
-                o = self._call_object_types(TYPE, grouped, blgroup, name+"_"+TYPE, scene)
+        stack = [(parent, name, (name,))]
+        while stack:
+            parent, name, chain = stack.pop()
+            if name not in self.dwg.blocks:
+                continue
+            e = self._new("objects", name, None)
+            scene.collection.objects.link(e)
+            #e.location = parent.location
+            e.parent = parent
+            for template in self._block_templates(name):
+                o = self._copy(template)
+                scene.collection.objects.link(o)
+                blgroup.objects.link(o)
                 #o.location = e.location
                 o.parent = e
+            for en in self.dwg.blocks[name]:
+                if en.dxftype == "INSERT":
+                    if en.name in chain:
+                        self.errors.add("DXF-Import: block '%s' inserts itself." % en.name)
+                        continue
+                    stack.append((e, en.name, chain + (en.name,)))
+
+    def _is_curve_group(self, TYPE):
+        return TYPE == "object_curve" or (type(TYPE) is str and is_.curve(TYPE))
 
     def combined_objects(self, entities, scene, override_name=None, override_group=None):
         """
@@ -1491,7 +2077,47 @@ class Do:
         override_group & override_name: for use within insert() and block()
         Adds multiple dxf entities to one Blender object (per blender or dxf type).
         """
-        objects = []
+        return [o for o, size in self.iter_combined_objects(entities, scene, override_name, override_group)
+                if o is not None]
+
+    def iter_combined_objects(self, entities, scene, override_name=None, override_group=None):
+        """
+        Resumable version of combined_objects(): yields the committed object (or None) and the entity count of every
+        batch.
+        The entities are sorted into batches first and all curve batches are submitted to the preparation pool at once;
+        every step then only commits one batch on the calling thread, in batch order.
+        """
+        batches = []  # (TYPE, entities, group, name)
+        if self.but_group_by_att and self.combination in (BY_LAYER, BY_DXFTYPE):
+            groups = {}
+            for (layer_name, TYPE, atts), by_att in groupsort.by_layer_type_attributes(
+                    entities, self.combination == BY_LAYER):
+                if override_group is not None:
+                    group = override_group
+                elif layer_name in groups:
+                    group = groups[layer_name]
+                else:
+                    group = groups[layer_name] = self._get_group(layer_name)
+                if override_name is not None:
+                    layer_name = override_name
+
+                thickness, subd, width, extrusion = atts
+                if extrusion is None:  # unset extrusion defaults to (0, 0, 1)
+                    extrusion = (0, 0, 1)
+                att = ""
+                if thickness != 0:
+                    att += "thickness" + str(thickness) + ", "
+                if subd > 0:
+                    att += "subd" + str(subd) + ", "
+                if width != ((0, 0),):
+                    att += "width" + str(list(width)) + ", "
+                if extrusion != (0, 0, 1):
+                    att += "extrusion" + str([str(round(c, 1)) + ".." + str(c)[-1:] for c in extrusion]) + ", "
+                name = layer_name + "_" + TYPE.replace("object_", "") + "_" + att
+
+                batches.append((TYPE, by_att, group, name))
+            entities = ()
+
         for layer_name, layer_ents in groupsort.by_layer(entities):
             # group and name
             if override_group is None:
@@ -1512,61 +2138,63 @@ class Do:
                 break
 
             for TYPE, grouped_entities in group_sorted:
-                if self.but_group_by_att and self.combination != BY_CLOSED_NO_BULGE_POLY and self.combination != BY_BLOCK:
-                    for atts, by_att in groupsort.by_attributes(grouped_entities):
-                        thickness, subd, width, extrusion = atts
-                        if extrusion is None:  # unset extrusion defaults to (0, 0, 1)
-                            extrusion = (0, 0, 1)
-                        att = ""
-                        if thickness != 0:
-                            att += "thickness" + str(thickness) + ", "
-                        if subd > 0:
-                            att += "subd" + str(subd) + ", "
-                        if width != [(0, 0)]:
-                            att += "width" + str(width) + ", "
-                        if extrusion != (0, 0, 1):
-                            att += "extrusion" + str([str(round(c, 1)) + ".." + str(c)[-1:] for c in extrusion]) + ", "
-                        name = layer_name + "_" + TYPE.replace("object_", "") + "_" + att
-
-                        o = self._call_object_types(TYPE, by_att, group, name, scene, False)
-                        if o is not None:
-                            objects.append(o)
+                if type(TYPE) is bool and not TYPE:
+                    for ttype, sub_entities in groupsort.by_blender_type(grouped_entities):
+                        name = layer_name + "_" + ttype.replace("object_", "")
+                        batches.append((ttype, sub_entities, group, name))
                 else:
-                    if type(TYPE) is bool and not TYPE:
-                        for ttype, sub_entities in groupsort.by_blender_type(grouped_entities):
-                            name = layer_name + "_" + ttype.replace("object_", "")
-                            o = self._call_object_types(ttype, sub_entities, group, name, scene, False)
-                            if o is not None:
-                                objects.append(o)
-                    else:
-                        if TYPE == "INSERT" and self.combination == BY_BLOCK:
-                            for NAME, grouped_inserts in groupsort.by_insert_block_name(grouped_entities):
-                                sorted_inserts = []
-                                separates = []
-                                for i in grouped_inserts:
-                                    sames = 1
-                                    for c in range(2):
-                                        if i.scale[c+1] - i.scale[0] < 0.00001:
-                                            sames += 1
-                                    if not (sames == 3 or (sames == 2 and i.scale[2] == 1)):
-                                        print(i.scale)
-                                        separates.append(i)
+                    if TYPE == "INSERT" and self.combination == BY_BLOCK:
+                        for NAME, grouped_inserts in groupsort.by_insert_block_name(grouped_entities):
+                            sorted_inserts = []
+                            separates = []
+                            for i in grouped_inserts:
+                                sames = 1
+                                for c in range(2):
+                                    if i.scale[c+1] - i.scale[0] < 0.00001:
+                                        sames += 1
+                                if not (sames == 3 or (sames == 2 and i.scale[2] == 1)):
+                                    print(i.scale)
+                                    separates.append(i)
+                                else:
+                                    if i.extrusion == (0, 0, 1) and i.rotation == 0.0 and i.scale == (1, 1, 1):
+                                        sorted_inserts.insert(0, i)
                                     else:
-                                        if i.extrusion == (0, 0, 1) and i.rotation == 0.0 and i.scale == (1, 1, 1):
-                                            sorted_inserts.insert(0, i)
-                                        else:
-                                            sorted_inserts.append(i)
-
-                                if len(sorted_inserts) > 0:
-                                    self._dupliface(NAME, sorted_inserts, group, scene)
-                                for s in separates:
-                                    self.insert(s, scene, NAME, group)
-                        else:
-                            name = layer_name + "_" + TYPE.replace("object_", "") if type(TYPE) is str else "MERGED_POLYS"
-                            o = self._call_object_types(TYPE, grouped_entities, group, name, scene, False)
-                            if o is not None:
-                                objects.append(o)
-        return objects
+                                        sorted_inserts.append(i)
+
+                            batches.append((BLOCK_INSERTS, (sorted_inserts, separates), group, NAME))
+                    else:
+                        name = layer_name + "_" + TYPE.replace("object_", "") if type(TYPE) is str else "MERGED_POLYS"
+                        batches.append((TYPE, list(grouped_entities), group, name))
+
+        # a pool only pays off with several curve batches; pyproj transformations are kept on a single thread
+        threads = self.threads
+        if sum(1 for batch in batches if self._is_curve_group(batch[0])) < 2 or self.pScene is not None:
+            threads = 1
+
+        with prepare.executor(threads) as executor:
+            futures = [executor.submit(self.prepare_curve, ents) if self._is_curve_group(TYPE) else None
+                       for TYPE, ents, group, name in batches]
+            try:
+                for (TYPE, ents, group, name), future in zip(batches, futures):
+                    if TYPE == BLOCK_INSERTS:
+                        sorted_inserts, separates = ents
+                        if len(sorted_inserts) > 0:
+                            self._dupliface(name, sorted_inserts, group, scene)
+                        for s in separates:
+                            self.insert(s, scene, name, group)
+                        yield None, len(sorted_inserts) + len(separates)
+                        continue
+
+                    prepared = future.result() if future is not None else None
+                    if future is not None and prepared is None:
+                        yield None, len(ents)
+                        continue
+                    yield self._call_object_types(TYPE, ents, group, name, scene, False, prepared), len(ents)
+            finally:
+                # a closed generator does not wait for batches it will never commit
+                for future in futures:
+                    if future is not None:
+                        future.cancel()
 
     def separated_entities(self, entities, scene, override_name=None, override_group=None):
         """
@@ -1612,22 +2240,56 @@ class Do:
     def entities(self, name, scene=None):
         """
         Iterates over all DXF entities according to the options set by user.
+        Returns the manifest of created datablocks: {bpy.data collection name: list of datablocks}.
+        """
+        for progress in self.iter_entities(name, scene):
+            pass
+        return self.manifest
+
+    def iter_entities(self, name, scene=None, chunk_size=SEPARATED_CHUNK):
+        """
+        name: name used by recenter
+        chunk_size: number of separated entities imported per step
+        Resumable version of entities(): every step commits one batch of combined entities or chunk_size separated
+        entities and then yields (done, total) entity counts, so that the import can be driven by a modal timer.
+        The curve batches of all layers are prepared in the worker pool up front, as in a single combined_objects() call.
+        Closing the generator early leaves the datablocks of the finished steps in place.
         """
         if scene is None:
             scene = bpy.context.scene
 
         self.current_scene = scene
-
-        if self.recenter:
-            self.objects_before += scene.objects[:]
+        self.scene_offset = self._scene_offset(scene)
 
         if self.combination == BY_BLOCK:
-            self.combined_objects((en for en in self.dwg.modelspace()), scene)
+            combined = list(self.dwg.modelspace())
+            separated = []
         elif self.combination != SEPARATED:
-            self.combined_objects((en for en in self.dwg.modelspace() if is_.combined_entity(en)), scene)
-            self.separated_entities((en for en in self.dwg.modelspace() if is_.separated_entity(en)), scene)
+            combined = [en for en in self.dwg.modelspace() if is_.combined_entity(en)]
+            separated = [en for en in self.dwg.modelspace() if is_.separated_entity(en)]
         else:
-            self.separated_entities((en for en in self.dwg.modelspace() if en.dxftype != "ATTDEF"), scene)
+            combined = []
+            separated = [en for en in self.dwg.modelspace() if en.dxftype != "ATTDEF"]
+
+        # one pass over all combined entities, so that every curve batch is prepared up front in a single pool
+        batches = self.iter_combined_objects(combined, scene)
+        chunks = [separated[i:i + chunk_size] for i in range(0, len(separated), chunk_size)]
+        # progress is counted in entities, the number of batches is only known after sorting
+        total = len(combined) + len(separated) + 1
+        done = 0
+
+        try:
+            for o, size in batches:
+                done += size
+                yield done, total
+        finally:
+            batches.close()
+        done = len(combined)
+
+        for chunk in chunks:
+            self.separated_entities(chunk, scene)
+            done += len(chunk)
+            yield done, total
 
         if self.recenter:
             self._recenter(scene, name)
@@ -1641,6 +2303,7 @@ class Do:
 
         #bpy.context.screen.scene = scene
 
-        return self.errors
+        yield total, total
+
         # trying to import dimensions:
         # self.separated_objects((block for block in self.dwg.blocks if block.name.startswith("*")))
@@ -18,55 +18,96 @@
 
 # <pep8 compliant>
 
-import itertools
 from . import is_
 from mathutils import Vector
 
 
+_BLENDER_TYPES = {}
+
+
 def map_dxf_to_blender_type(TYPE):
     """
     TYPE: DXF entity type (String)
     """
+    blender_type = _BLENDER_TYPES.get(TYPE)
+    if blender_type is not None:
+        return blender_type
+
     if is_.mesh(TYPE):
-        return "object_mesh"
-    if is_.curve(TYPE):
-        return "object_curve"
-    if is_.nurbs(TYPE):
-        return "object_surface"
+        blender_type = "object_mesh"
+    elif is_.curve(TYPE):
+        blender_type = "object_curve"
+    elif is_.nurbs(TYPE):
+        blender_type = "object_surface"
     else:
         print("groupsort: not mergeable type ", TYPE)
-        return "not_mergeable"
+        blender_type = "not_mergeable"
+    _BLENDER_TYPES[TYPE] = blender_type
+    return blender_type
+
+
+def _buckets(entities, keyf):
+    """
+    entities: list of DXF entities
+    keyf: function returning a hashable key for an entity
+    Single pass hash bucketing instead of sorting; returns (key, list of entities) pairs in the order in which the keys
+    occur first, so the result is deterministic for a given drawing.
+    """
+    buckets = {}
+    for en in entities:
+        key = keyf(en)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = []
+        bucket.append(en)
+    return buckets.items()
 
 
 def by_blender_type(entities):
     """
     entities: list of DXF entities
     """
-    keyf = lambda e: map_dxf_to_blender_type(e.dxftype)
-    return itertools.groupby(sorted(entities, key=keyf), key=keyf)
+    return _buckets(entities, lambda e: map_dxf_to_blender_type(e.dxftype))
 
 
 def by_layer(entities):
     """
     entities: list of DXF entities
     """
-    keyf = lambda e: e.layer
-    return itertools.groupby(sorted(entities, key=keyf), key=keyf)
+    return _buckets(entities, lambda e: e.layer)
+
 
 def by_closed_poly_no_bulge(entities):
     """
     entities: list of DXF entities
     """
-    keyf = lambda e: is_.closed_poly_no_bulge(e)
-    return itertools.groupby(sorted(entities, key=keyf), key=keyf)
+    return _buckets(entities, is_.closed_poly_no_bulge)
 
 
 def by_dxftype(entities):
     """
     entities: list of DXF entities
     """
-    keyf = lambda e: e.dxftype
-    return itertools.groupby(sorted(entities, key=keyf), key=keyf)
+    return _buckets(entities, lambda e: e.dxftype)
+
+
+def attributes(entity):
+    """
+    entity: DXF entity
+    Returns the hashable (thickness, subdivision_levels, width, extrusion) key of an entity; width is a tuple of
+    (start, end) tuples.
+    """
+    width = ((0, 0),)
+    subd = -1
+    extrusion = entity.extrusion
+    if hasattr(entity, "width"):
+        if any((w != 0 for ww in entity.width for w in ww)):
+            width = tuple(tuple(ww) for ww in entity.width)
+    if hasattr(entity, "subdivision_levels"):
+        subd = entity.subdivision_levels
+    if entity.dxftype in {"LINE", "POINT"}:
+        extrusion = (0.0, 0.0, 1.0)
+    return entity.thickness, subd, width, extrusion
 
 
 def by_attributes(entities):
@@ -74,24 +115,23 @@ def by_attributes(entities):
     entities: list of DXF entities
     attributes: thickness and width occurring in curve types; subdivision_levels occurring in MESH dxf types
     """
-    def attributes(entity):
-        width = [(0, 0)]
-        subd = -1
-        extrusion = entity.extrusion
-        if hasattr(entity, "width"):
-            if any((w != 0 for ww in entity.width for w in ww)):
-                width = entity.width
-        if hasattr(entity, "subdivision_levels"):
-            subd = entity.subdivision_levels
-        if entity.dxftype in {"LINE", "POINT"}:
-            extrusion = (0.0, 0.0, 1.0)
-        return entity.thickness, subd, width, extrusion
-
-    return itertools.groupby(sorted(entities, key=attributes), key=attributes)
+    return _buckets(entities, attributes)
+
+
+def by_layer_type_attributes(entities, blender_type=True):
+    """
+    entities: list of DXF entities
+    blender_type: True to key on the Blender type, False to key on the DXF type
+    Buckets the entities by (layer, type, attributes) in one pass; replaces by_layer() followed by by_blender_type() /
+    by_dxftype() and by_attributes().
+    """
+    if blender_type:
+        return _buckets(entities, lambda e: (e.layer, map_dxf_to_blender_type(e.dxftype), attributes(e)))
+    return _buckets(entities, lambda e: (e.layer, e.dxftype, attributes(e)))
+
 
 def by_insert_block_name(inserts):
     """
     entities: list of DXF inserts
     """
-    keyf = lambda e: e.name
-    return itertools.groupby(sorted(inserts, key=keyf), key=keyf)
+    return _buckets(inserts, lambda e: e.name)
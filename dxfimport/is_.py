@@ -34,7 +34,7 @@ def mesh(typestr):
 _POLYS = frozenset(["LWPOLYLINE", "POLYLINE"])
 
 def closed_poly_no_bulge(entity):
-    return entity.dxftype in _POLYS and not any([b != 0 for b in entity.bulge]) and entity.is_closed
+    return entity.dxftype in _POLYS and not any(entity.bulge) and entity.is_closed
 
 
 _CURVE_ENTITIES = frozenset(("POLYLINE", "POLYGON", "LWPOLYLINE", "SPLINE",
@@ -0,0 +1,251 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+"""
+Plain data containers for the preparation stage of the DXF import.
+
+The preparation stage turns DXF entities into numpy arrays and must not touch bpy, so that it can run in worker
+threads. The commit stage (Do._commit_curve()) is the only place where these arrays become Blender datablocks.
+"""
+
+import os
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from math import tan, pi
+
+
+KAPPA = 4 / 3 * tan(pi / 8)
+
+
+class Spline:
+    """
+    A single prepared spline. `co` is a (n, 3) array of projected coordinates. Bezier splines also carry
+    `handle_left` and `handle_right` arrays of the same shape.
+    """
+    __slots__ = ("kind", "co", "handle_left", "handle_right", "cyclic", "handle_type")
+
+    def __init__(self, kind, co, handle_left=None, handle_right=None, cyclic=False, handle_type=None):
+        self.kind = kind
+        self.co = co
+        self.handle_left = handle_left
+        self.handle_right = handle_right
+        self.cyclic = cyclic
+        self.handle_type = handle_type
+
+    def __len__(self):
+        return len(self.co)
+
+
+class Curve:
+    """
+    Plain counterpart of a Blender curve datablock; collects the splines of one layer/type group.
+    entity: the last entity of the group; used for thickness, width and extrusion of the resulting object
+    removed: number of vertices dropped by simplify()
+    edges: (verts, edges) arrays from tessellate() if the curve is committed as an edge mesh
+    """
+    __slots__ = ("splines", "is_3d", "entity", "removed", "edges")
+
+    def __init__(self):
+        self.splines = []
+        self.is_3d = False
+        self.entity = None
+        self.removed = 0
+        self.edges = None
+
+    def poly(self, co, cyclic=False):
+        self.splines.append(Spline("POLY", co, cyclic=cyclic))
+
+    def bezier(self, co, handle_left, handle_right, cyclic=False, handle_type=None):
+        self.splines.append(Spline("BEZIER", co, handle_left, handle_right, cyclic, handle_type))
+
+    def bounds(self):
+        """
+        Returns the (2, 3) min and max corner of all vertices or control points (a bezier lies within the hull of its
+        handles), or None for a curve without points.
+        """
+        if self.edges is not None:
+            arrays = [self.edges[0]]
+        else:
+            arrays = [a for s in self.splines for a in (s.co, s.handle_left, s.handle_right) if a is not None]
+        arrays = [a for a in arrays if len(a) > 0]
+        if len(arrays) == 0:
+            return None
+        co = np.concatenate(arrays)
+        return np.stack((co.min(axis=0), co.max(axis=0)))
+
+    def check_3d(self):
+        """
+        Sets is_3d if any coordinate is elevated from the z-plane.
+        """
+        if not self.is_3d:
+            self.is_3d = any(np.any(s.co[:, 2] != 0) for s in self.splines if len(s) > 0)
+
+
+def _ellipse_template():
+    directions = np.array(((1., 0.), (0., 1.), (-1., 0.), (0., -1.)))
+    tangents = np.roll(directions, -1, axis=0) * KAPPA
+    template = np.stack((directions - tangents, directions, directions + tangents))
+    template.flags.writeable = False
+    return template
+
+
+# (handle_left, co, handle_right) x 4 points of a closed unit circle in (major, minor) coordinates
+ELLIPSE_TEMPLATE = _ellipse_template()
+
+
+def _segment_distances(p, a, b):
+    """
+    Distances of the points p to the segments a-b; all arguments are (n, 3) arrays.
+    """
+    ab = b - a
+    ab2 = np.einsum("ij,ij->i", ab, ab)
+    t = np.einsum("ij,ij->i", p - a, ab) / np.where(ab2 > 0, ab2, 1)
+    t = np.clip(t, 0, 1)
+    return np.linalg.norm(p - (a + t[:, None] * ab), axis=1)
+
+
+def simplify(co, tolerance, cyclic=False):
+    """
+    co: (n, 3) array of polyline vertices
+    tolerance: maximum distance of a removed vertex to the simplified polyline
+    cyclic: the polyline is closed; its first vertex is always kept
+    Douglas-Peucker simplification that splits all segments of one recursion level in a single vectorized pass.
+    Returns the simplified (m, 3) array and the number of removed vertices.
+    """
+    n = len(co)
+    if tolerance <= 0 or n < 3:
+        return co, 0
+
+    points = np.concatenate((co, co[:1])) if cyclic else co
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    while True:
+        kept = np.flatnonzero(keep)
+        starts = kept[:-1]
+        segment = np.repeat(np.arange(len(starts)), np.diff(kept))  # anchor segment of every vertex but the last
+        d = _segment_distances(points[:-1], points[starts][segment], points[kept[1:]][segment])
+        d[keep[:-1]] = 0
+
+        # vertices sorted by segment and descending distance; the first one of each segment is its farthest
+        farthest = np.lexsort((-d, segment))[starts]
+        split = farthest[d[farthest] > tolerance]
+        if len(split) == 0:
+            break
+        keep[split] = True
+
+    if cyclic:
+        keep = keep[:-1]
+    m = np.count_nonzero(keep)
+    if m == n or (cyclic and m < 3):
+        return co, 0
+    return co[keep], n - m
+
+
+# upper limit of line segments per bezier segment in tessellate()
+MAX_BEZIER_STEPS = 1024
+
+
+def _flatten_bezier(spline, chord_tolerance):
+    """
+    Samples every segment of a bezier spline in as many equal parameter steps as needed to stay within
+    chord_tolerance; the deviation of a cubic from its chords is at most 3/4 * max(|second difference|) / steps^2.
+    Cyclic splines do not repeat their first point.
+    """
+    co, hl, hr = spline.co, spline.handle_left, spline.handle_right
+    if spline.cyclic:
+        p0, p1, p2, p3 = co, hr, np.roll(hl, -1, axis=0), np.roll(co, -1, axis=0)
+    else:
+        p0, p1, p2, p3 = co[:-1], hr[:-1], hl[1:], co[1:]
+    if len(p0) == 0:
+        return co
+
+    dd = np.maximum(np.linalg.norm(p0 - 2 * p1 + p2, axis=1), np.linalg.norm(p1 - 2 * p2 + p3, axis=1))
+    steps = np.ceil(np.sqrt(0.75 * dd / chord_tolerance))
+    steps = np.clip(steps, 1, MAX_BEZIER_STEPS).astype(np.intp)
+
+    segment = np.repeat(np.arange(len(steps)), steps)
+    t = (np.arange(len(segment)) - (np.cumsum(steps) - steps)[segment]) / steps[segment]
+    t = t[:, None]
+    mt = 1 - t
+    points = mt ** 3 * p0[segment] + 3 * mt * mt * t * p1[segment] + 3 * mt * t * t * p2[segment] + \
+        t ** 3 * p3[segment]
+    if not spline.cyclic:
+        points = np.concatenate((points, co[-1:]))
+    return points
+
+
+def tessellate(curve, chord_tolerance):
+    """
+    curve: Curve
+    chord_tolerance: maximum distance between a bezier segment and its line segments
+    Returns the (n, 3) vertices and (m, 2) edge indices of all splines as one edge-only mesh.
+    """
+    verts = []
+    edges = []
+    offset = 0
+    for spline in curve.splines:
+        points = spline.co if spline.kind == "POLY" else _flatten_bezier(spline, chord_tolerance)
+        n = len(points)
+        if n < 2:
+            continue
+        index = np.arange(offset, offset + n)
+        edges.append(np.stack((index[:-1], index[1:]), axis=1))
+        if spline.cyclic and n > 2:
+            edges.append(np.array(((index[-1], index[0]),)))
+        verts.append(points)
+        offset += n
+
+    if offset == 0:
+        return np.empty((0, 3)), np.empty((0, 2), dtype=np.intp)
+    return np.concatenate(verts), np.concatenate(edges)
+
+
+class _InlineExecutor:
+    """
+    Drop-in for ThreadPoolExecutor that runs every job immediately; used for single threaded imports.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def executor(threads=None):
+    """
+    threads: number of worker threads; None uses one per core, 1 (or less) prepares on the calling thread
+    Returns a context manager with a submit() method like concurrent.futures.Executor.
+    Only the numpy parts of a preparation (simplify(), tessellate(), the arc and bulge batches) release the GIL;
+    reading the vertices of dxfgrabber entities into arrays and the mathutils based SPLINE conversion do not, so
+    drawings made of many small entities gain little from more threads.
+    """
+    if threads is None:
+        threads = os.cpu_count() or 1
+    if threads <= 1:
+        return _InlineExecutor()
+    return ThreadPoolExecutor(max_workers=threads, thread_name_prefix="dxf-prepare")
@@ -108,6 +108,13 @@ class ImportSTL(Operator, ImportHelper):
         description="Use (import) facet normals (note that this will still give flat shading)",
         default=False,
     )
+    weld_tolerance: FloatProperty(
+        name="Weld Distance",
+        description="Merge vertices closer than about this distance (in file units), 0 merges exact duplicates only",
+        min=0.0, soft_max=0.1,
+        default=0.0,
+        precision=6,
+    )
 
     def execute(self, context):
         import os
@@ -138,11 +145,17 @@ class ImportSTL(Operator, ImportHelper):
         if bpy.ops.object.select_all.poll():
             bpy.ops.object.select_all(action='DESELECT')
 
-        for path in paths:
+        # files are parsed in worker threads, meshes are created here in selection order
+        merged = points = 0
+        for path, (tris, tri_nors, pts), stats in stl_utils.read_stl_files(paths, weld_tolerance=self.weld_tolerance):
             objName = bpy.path.display_name(os.path.basename(path))
-            tris, tri_nors, pts = stl_utils.read_stl(path)
             tri_nors = tri_nors if self.use_facet_normal else None
             blender_utils.create_and_link_mesh(objName, tris, tri_nors, pts, global_matrix)
+            merged += stats["merged"]
+            points += stats["points"]
+
+        if self.weld_tolerance > 0:
+            self.report({'INFO'}, "Welding merged {} of {} points".format(merged, points))
 
         return {'FINISHED'}
 
@@ -200,6 +213,7 @@ class STL_PT_import_geometry(bpy.types.Panel):
         operator = sfile.active_operator
 
         layout.prop(operator, "use_facet_normal")
+        layout.prop(operator, "weld_tolerance")
 
 
 @orientation_helper(axis_forward='Y', axis_up='Z')
@@ -250,7 +264,7 @@ class ExportSTL(Operator, ExportHelper):
 
     def execute(self, context):
         import os
-        import itertools
+        import numpy as np
         from mathutils import Matrix
         from . import stl_utils
         from . import blender_utils
@@ -286,16 +300,19 @@ class ExportSTL(Operator, ExportHelper):
         ).to_4x4() @ Matrix.Scale(global_scale, 4)
 
         if self.batch_mode == 'OFF':
-            faces = itertools.chain.from_iterable(
-                    blender_utils.faces_from_mesh(ob, global_matrix, self.use_mesh_modifiers)
-                    for ob in data_seq)
+            triangles = [blender_utils.triangles_from_mesh(ob, global_matrix, self.use_mesh_modifiers)
+                         for ob in data_seq]
+            triangles = [t for t in triangles if t is not None]
+            faces = np.concatenate(triangles) if triangles else np.empty((0, 3, 3), dtype=np.float32)
 
             stl_utils.write_stl(faces=faces, **keywords)
         elif self.batch_mode == 'OBJECT':
             prefix = os.path.splitext(self.filepath)[0]
             keywords_temp = keywords.copy()
             for ob in data_seq:
-                faces = blender_utils.faces_from_mesh(ob, global_matrix, self.use_mesh_modifiers)
+                faces = blender_utils.triangles_from_mesh(ob, global_matrix, self.use_mesh_modifiers)
+                if faces is None:
+                    faces = np.empty((0, 3, 3), dtype=np.float32)
                 keywords_temp["filepath"] = prefix + bpy.path.clean_name(ob.name) + ".stl"
                 stl_utils.write_stl(faces=faces, **keywords_temp)
 
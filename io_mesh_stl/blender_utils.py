@@ -19,64 +19,84 @@
 # <pep8 compliant>
 
 
-def create_and_link_mesh(name, faces, face_nors, points, global_matrix):
+def create_mesh(name, faces, face_nors, points, global_matrix):
     """
-    Create a blender mesh and object called name from a list of
-    *points* and *faces* and link it in the current scene.
+    Create a blender mesh called name from arrays of *points* and
+    triangle *faces*.
     """
 
-    import array
-    from itertools import chain
+    import numpy as np
     import bpy
 
-    mesh = bpy.data.meshes.new(name)
-    mesh.from_pydata(points, [], faces)
+    faces = np.asarray(faces, dtype=np.int32).reshape(-1, 3)
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+    n_tris = len(faces)
 
-    if face_nors:
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(points))
+    mesh.vertices.foreach_set("co", points.ravel())
+    mesh.loops.add(n_tris * 3)
+    mesh.loops.foreach_set("vertex_index", faces.ravel())
+    mesh.polygons.add(n_tris)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, n_tris * 3, 3, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_total", np.full(n_tris, 3, dtype=np.int32))
+    mesh.update(calc_edges=True)
+
+    if face_nors is not None:
         # Note: we store 'temp' normals in loops, since validate() may alter final mesh,
         #       we can only set custom lnors *after* calling it.
         mesh.create_normals_split()
-        lnors = tuple(chain(*chain(*zip(face_nors, face_nors, face_nors))))
-        mesh.loops.foreach_set("normal", lnors)
+        lnors = np.repeat(np.asarray(face_nors, dtype=np.float32), 3, axis=0)
+        mesh.loops.foreach_set("normal", lnors.ravel())
 
     mesh.transform(global_matrix)
 
     # update mesh to allow proper display
     mesh.validate(clean_customdata=False)  # *Very* important to not remove lnors here!
 
-    if face_nors:
-        clnors = array.array('f', [0.0] * (len(mesh.loops) * 3))
+    if face_nors is not None:
+        clnors = np.empty(len(mesh.loops) * 3, dtype=np.float32)
         mesh.loops.foreach_get("normal", clnors)
 
-        mesh.polygons.foreach_set("use_smooth", [True] * len(mesh.polygons))
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=bool))
 
-        mesh.normals_split_custom_set(tuple(zip(*(iter(clnors),) * 3)))
+        mesh.normals_split_custom_set(clnors.reshape(-1, 3))
         mesh.use_auto_smooth = True
         mesh.show_edge_sharp = True
         mesh.free_normals_split()
 
     mesh.update()
+    return mesh
+
 
+def create_and_link_mesh(name, faces, face_nors, points, global_matrix):
+    """
+    Create a blender mesh and object called name from arrays of
+    *points* and triangle *faces* and link it in the current scene.
+    """
+
+    import bpy
+
+    mesh = create_mesh(name, faces, face_nors, points, global_matrix)
     obj = bpy.data.objects.new(name, mesh)
     bpy.context.collection.objects.link(obj)
     bpy.context.view_layer.objects.active = obj
     obj.select_set(True)
+    return obj
 
 
-def faces_from_mesh(ob, global_matrix, use_mesh_modifiers=False):
+def triangles_from_mesh(ob, global_matrix, use_mesh_modifiers=False):
     """
-    From an object, return a generator over a list of faces.
+    From an object, return the corners of its triangles as a float32 array
+    shaped (n, 3, 3), read with foreach_get.
 
-    Each faces is a list of his vertexes. Each vertex is a tuple of
-    his coordinate.
+    Returns None for objects without mesh data.
 
     use_mesh_modifiers
-        Apply the preview modifier to the returned liste
-
-    triangulate
-        Split the quad into two triangles
+        Apply the preview modifier to the returned array
     """
 
+    import numpy as np
     import bpy
 
     # get the editmode data
@@ -94,10 +114,10 @@ def faces_from_mesh(ob, global_matrix, use_mesh_modifiers=False):
     try:
         mesh = mesh_owner.to_mesh()
     except RuntimeError:
-        return
+        return None
 
     if mesh is None:
-        return
+        return None
 
     mat = global_matrix @ ob.matrix_world
     mesh.transform(mat)
@@ -105,9 +125,11 @@ def faces_from_mesh(ob, global_matrix, use_mesh_modifiers=False):
         mesh.flip_normals()
     mesh.calc_loop_triangles()
 
-    vertices = mesh.vertices
-
-    for tri in mesh.loop_triangles:
-        yield [vertices[index].co.copy() for index in tri.vertices]
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tris)
 
     mesh_owner.to_mesh_clear()
+
+    return co.reshape(-1, 3)[tris].reshape(-1, 3, 3)
@@ -28,34 +28,7 @@ blender --python stl_utils.py -- file1.stl file2.stl file3.stl ...
 
 # TODO: endien
 
-
-class ListDict(dict):
-    """
-    Set struct with order.
-
-    You can:
-       - insert data into without doubles
-       - get the list of data in insertion order with self.list
-
-    Like collections.OrderedDict, but quicker, can be replaced if
-    ODict is optimised.
-    """
-
-    def __init__(self):
-        dict.__init__(self)
-        self.list = []
-        self._len = 0
-
-    def add(self, item):
-        """
-        Add a value to the Set, return its position in it.
-        """
-        value = self.setdefault(item, self._len)
-        if value == self._len:
-            self.list.append(item)
-            self._len += 1
-
-        return value
+import numpy as np
 
 
 # an stl binary file is
@@ -69,6 +42,13 @@ class ListDict(dict):
 BINARY_HEADER = 80
 BINARY_STRIDE = 12 * 4 + 2
 
+# one facet record of a binary stl file
+BINARY_DTYPE = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attribute", "<u2"),
+])
+
 
 def _header_version():
     import bpy
@@ -103,12 +83,14 @@ def _is_ascii_file(data):
     return (file_size != BINARY_HEADER + 4 + BINARY_STRIDE * size)
 
 
-def _binary_read(data):
-    # Skip header...
-
+def _binary_size(data):
+    """
+    Return the number of facets of a binary stl file and leave data at the first facet.
+    """
     import os
     import struct
 
+    # Skip header...
     data.seek(BINARY_HEADER)
     size = struct.unpack('<I', data.read(4))[0]
 
@@ -123,23 +105,39 @@ def _binary_read(data):
         size = file_size // BINARY_STRIDE
         print("WARNING! Reported size (facet number) is 0, inferring %d facets from file size." % size)
 
-    # We read 4096 elements at once, avoids too much calls to read()!
-    CHUNK_LEN = 4096
-    chunks = [CHUNK_LEN] * (size // CHUNK_LEN)
-    chunks.append(size % CHUNK_LEN)
+    return size
 
-    unpack = struct.Struct('<12f').unpack_from
-    for chunk_len in chunks:
-        if chunk_len == 0:
-            continue
-        buf = data.read(BINARY_STRIDE * chunk_len)
-        for i in range(chunk_len):
-            # read the normal and points coordinates of each triangle
-            pt = unpack(buf, BINARY_STRIDE * i)
-            yield pt[:3], (pt[3:6], pt[6:9], pt[9:])
 
+# three numbers following a keyword of an ascii stl file
+_ASCII_NUMBERS = rb'\s+(\S+\s+\S+\s+\S+)'
 
-def _ascii_read(data):
+
+def _ascii_floats(groups):
+    """
+    Convert whitespace separated number groups to one float32 array shaped (n, 3).
+    """
+    import warnings
+
+    with warnings.catch_warnings():
+        # fromstring() stops at the first malformed number with a DeprecationWarning
+        warnings.simplefilter("ignore", DeprecationWarning)
+        floats = np.fromstring(b' '.join(groups), dtype=np.float64, sep=' ')
+    if len(floats) != len(groups) * 3:
+        # slower, but names the offending token
+        floats = np.array(b' '.join(groups).split()).astype(np.float64)
+    return floats.astype(np.float32).reshape(-1, 3)
+
+
+def _ascii_read_arrays(data):
+    """
+    Read all facets of an ascii stl file.
+
+    - returns a tuple(normals, vertices) of float32 arrays shaped (n, 3) and (n, 3, 3).
+
+    The whole file is tokenized at once: only the numbers following
+    'facet normal' and 'vertex' are kept and converted in bulk, so solid
+    names, blank lines and CRLF endings do not matter.
+    """
     # an stl ascii file is like
     # HEADER: solid some name
     # for each face:
@@ -152,65 +150,229 @@ def _ascii_read(data):
     #     endloop
     #     endfacet
 
-    # strip header
+    # strip header, the solid name may contain anything
     data.readline()
+    return _ascii_parse(data.read())
 
-    curr_nor = None
 
-    for l in data:
-        l = l.lstrip()
-        if l.startswith(b'facet'):
-            curr_nor = tuple(map(float, l.split()[2:]))
-        # if we encounter a vertex, read next 2
-        if l.startswith(b'vertex'):
-            yield curr_nor, [tuple(map(float, l_item.split()[1:])) for l_item in (l, data.readline(), data.readline())]
+def _ascii_parse(buf):
+    """
+    Return a tuple(normals, vertices) like _ascii_read_arrays() of the facets in buf.
+    """
+    import re
+
+    vertices = buf.count(b'vertex')
+    if vertices == 3 * buf.count(b'normal'):
+        # usual layout, one pass collects normal, vertex, vertex, vertex of every facet
+        floats = _ascii_floats(re.findall(rb'\b(?:normal|vertex)' + _ASCII_NUMBERS, buf))
+        if len(floats) == 4 * (vertices // 3):
+            facets = floats.reshape(-1, 4, 3)
+            return facets[:, 0], facets[:, 1:]
+
+    vertices = _ascii_floats(re.findall(rb'\bvertex' + _ASCII_NUMBERS, buf))
+    vertices = vertices[:len(vertices) // 3 * 3].reshape(-1, 3, 3)
+    normals = _ascii_floats(re.findall(rb'\bfacet\s+normal' + _ASCII_NUMBERS, buf))
+    if len(normals) != len(vertices):
+        # facets without a normal, let Blender compute them
+        normals = np.zeros((len(vertices), 3), dtype=np.float32)
+    return normals, vertices
+
+
+def _index_dtype(count):
+    """
+    Smallest of int32 and int64 holding indices of count items.
+    """
+    return np.int32 if count <= np.iinfo(np.int32).max else np.int64
 
 
-def _binary_write(filepath, faces):
-    import struct
-    import itertools
-    from mathutils.geometry import normal
+def _unique_keys(keys):
+    """
+    Merge equal keys of a 1d array.
 
-    with open(filepath, 'wb') as data:
-        fw = data.write
-        # header
-        # we write padding at header beginning to avoid to
-        # call len(list(faces)) which may be expensive
-        fw(struct.calcsize('<80sI') * b'\0')
+    - returns a tuple(inverse, first); first holds the index of the first
+      occurrence of every unique key, in order of first occurrence, and
+      keys[i] equals keys[first[inverse[i]]].
+    """
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    order = np.argsort(first)
+    rank = np.empty(len(order), dtype=_index_dtype(len(keys)))
+    rank[order] = np.arange(len(order))
+    return rank[inverse.ravel()], first[order]
+
+
+def _row_keys(rows):
+    """
+    View the rows of a contiguous (m, 3) array as single void keys.
+    """
+    return rows.view(np.dtype((np.void, rows.dtype.itemsize * 3))).ravel()
+
+
+def _unique_points(points):
+    """
+    Merge equal points.
+
+    points
+       (m, 3) array of points
+
+    - returns a tuple(inverse, unique); unique points are ordered by their
+      first occurrence and points[i] equals unique[inverse[i]].
+    """
+    flat = np.ascontiguousarray(points, dtype=np.float32)
+    # -0.0 + 0.0 == +0.0, so both zeros get the same bytes
+    inverse, first = _unique_keys(_row_keys(flat + np.float32(0)))
+    return inverse, flat[first]
+
+
+def weld(triangles, points, tolerance):
+    """
+    Merge points closer than about tolerance.
+
+    Coordinates are snapped to a grid of tolerance sized cells and points
+    sharing a cell are merged into the first of them. Points on either side
+    of a cell border stay apart, even when closer than tolerance.
+
+    Triangles in a temporary file (see read_stl()) are remapped in place,
+    window by window, others are copied.
+
+    - returns a tuple(triangles, points, merged), merged being the number of
+      points removed.
+    """
+    if tolerance <= 0 or len(points) == 0:
+        return triangles, points, 0
+
+    cells = np.floor(np.asarray(points, dtype=np.float64) / tolerance + 0.5).astype(np.int64)
+    inverse, first = _unique_keys(_row_keys(cells))
+    del cells
+    if isinstance(triangles, np.memmap):
+        for start in range(0, len(triangles), WINDOW_FACETS):
+            triangles[start:start + WINDOW_FACETS] = inverse[triangles[start:start + WINDOW_FACETS]]
+    else:
+        triangles = inverse[triangles]
+    return triangles, points[first], len(points) - len(first)
 
-        # 3 vertex == 9f
-        pack = struct.Struct('<9f').pack
 
-        # number of vertices written
-        nb = 0
+def _index_points(vertices):
+    """
+    Merge equal vertices.
 
-        for face in faces:
-            # calculate face normal
-            # write normal + vertexes + pad as attributes
-            fw(struct.pack('<3f', *normal(*face)) + pack(*itertools.chain.from_iterable(face)))
-            # attribute byte count (unused)
-            fw(b'\0\0')
-            nb += 1
+    vertices
+       (n, 3, 3) array of triangle corners
 
-        # header, with correct value now
-        data.seek(0)
-        fw(struct.pack('<80sI', _header_version().encode('ascii'), nb))
+    - returns a tuple(triangles, points).
+    """
+    inverse, points = _unique_points(np.reshape(vertices, (-1, 3)))
+    return inverse.reshape(-1, 3), points
 
 
-def _ascii_write(filepath, faces):
-    from mathutils.geometry import normal
+# facets decoded at once by the memory-mapped reader (~50 MB of file)
+WINDOW_FACETS = 1 << 20
+# default limit for the arrays the memory-mapped reader keeps in RAM, larger ones go to temporary files
+RAM_BUDGET = 1 << 31
+
+
+def _buffer(shape, dtype, budget):
+    """
+    Return an empty array, backed by an anonymous temporary file if it is larger than budget bytes.
+    """
+    import tempfile
+
+    dtype = np.dtype(dtype)
+    if int(np.prod(shape)) * dtype.itemsize <= budget:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(tempfile.TemporaryFile(), dtype=dtype, mode='w+', shape=shape)
+
+
+def _mapped_facets(data, mm):
+    """
+    Return the facets of a binary stl file as a structured array viewing mm, the mapped file of data.
+    """
+    # a truncated file ends with the last complete facet
+    size = min(_binary_size(data), (len(mm) - BINARY_HEADER - 4) // BINARY_STRIDE)
+    return np.frombuffer(mm, dtype=BINARY_DTYPE, count=size, offset=BINARY_HEADER + 4)
+
+
+def _binary_read_mapped(data, ram_budget=RAM_BUDGET, window=WINDOW_FACETS):
+    """
+    Read a binary stl file through mmap, window by window.
+
+    Each window of facets is decoded straight from the mapped file and its
+    points are merged; the per window points are merged once more at the
+    end. Output arrays larger than ram_budget bytes live in temporary files,
+    triangles hold int32 indices unless there are more than 2**31 points.
+
+    The budget does not cover the sort buffers of np.unique: per window
+    they take a few times the window's points (bounded by window), the
+    final merge takes a few times the unique points of all windows.
+
+    - returns a tuple(triangles, normals, points) like read_stl().
+    """
+    import mmap
+
+    with mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        facets = _mapped_facets(data, mm)
+        size = len(facets)
+
+        tris = _buffer((size, 3), _index_dtype(size * 3), ram_budget // 3)
+        normals = _buffer((size, 3), np.float32, ram_budget // 3)
+        window_points = _buffer((size * 3, 3), np.float32, ram_budget // 3)
+        filled = 0
+        chunk = None
+        for start in range(0, size, window):
+            chunk = facets[start:start + window]
+            inverse, points = _unique_points(chunk["vertices"].reshape(-1, 3))
+            tris[start:start + len(chunk)] = (inverse + filled).reshape(-1, 3)
+            normals[start:start + len(chunk)] = chunk["normal"]
+            window_points[filled:filled + len(points)] = points
+            filled += len(points)
+        # views into the map must be gone before it closes
+        del facets, chunk
+
+    inverse, points = _unique_points(window_points[:filled])
+    for start in range(0, size, window):
+        tris[start:start + window] = inverse[tris[start:start + window]]
+    return tris, normals, points
+
+
+def _triangle_normals(triangles):
+    """
+    Unit normals of (n, 3, 3) triangle corners, zero for degenerated triangles like mathutils.geometry.normal().
+    """
+    nor = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    length = np.linalg.norm(nor, axis=1, keepdims=True)
+    return np.divide(nor, length, out=np.zeros_like(nor), where=length > 0)
+
+
+def _binary_write(filepath, triangles):
+    import struct
+
+    facets = np.zeros(len(triangles), dtype=BINARY_DTYPE)
+    facets["vertices"] = triangles
+    facets["normal"] = _triangle_normals(triangles)
+
+    with open(filepath, 'wb') as data:
+        data.write(struct.pack('<80sI', _header_version().encode('ascii'), len(facets)))
+        facets.tofile(data)
+
+
+# facets formatted at once by the ascii writer
+ASCII_CHUNK = 1 << 16
+ASCII_FACET = ('facet normal %f %f %f\nouter loop\n'
+               'vertex %f %f %f\nvertex %f %f %f\nvertex %f %f %f\n'
+               'endloop\nendfacet\n')
+
+
+def _ascii_write(filepath, triangles):
+    facets = np.concatenate((_triangle_normals(triangles)[:, None], triangles), axis=1).reshape(-1, 12)
 
     with open(filepath, 'w') as data:
         fw = data.write
         header = _header_version()
         fw('solid %s\n' % header)
 
-        for face in faces:
-            # calculate face normal
-            fw('facet normal %f %f %f\nouter loop\n' % normal(*face)[:])
-            for vert in face:
-                fw('vertex %f %f %f\n' % vert[:])
-            fw('endloop\nendfacet\n')
+        for start in range(0, len(facets), ASCII_CHUNK):
+            chunk = facets[start:start + ASCII_CHUNK]
+            fw((ASCII_FACET * len(chunk)) % tuple(chunk.ravel().tolist()))
 
         fw('endsolid %s\n' % header)
 
@@ -223,33 +385,43 @@ def write_stl(filepath="", faces=(), ascii=False):
        output filepath
 
     faces
-       iterable of tuple of 3 vertex, vertex is tuple of 3 coordinates as float
+       (n, 3, 3) float array like blender_utils.triangles_from_mesh() returns,
+       or iterable of tuple of 3 vertex, vertex is tuple of 3 coordinates as float
 
     ascii
        save the file in ascii format (very huge)
     """
-    (_ascii_write if ascii else _binary_write)(filepath, faces)
+    if not isinstance(faces, np.ndarray):
+        faces = list(faces)
+    triangles = np.asarray(faces, dtype=np.float32).reshape(-1, 3, 3)
+    (_ascii_write if ascii else _binary_write)(filepath, triangles)
 
 
-def read_stl(filepath):
+def read_stl(filepath, ram_budget=RAM_BUDGET, weld_tolerance=0.0, stats=None):
     """
-    Return the triangles and points of an stl binary file.
+    Return the triangles and points of an stl file.
 
-    Please note that this process can take lot of time if the file is
-    huge (~1m30 for a 1 Go stl file on an quad core i7).
+    Binary files are memory mapped and decoded as numpy structured arrays
+    window by window, equal points are merged with np.unique. Results larger
+    than ram_budget bytes are kept in temporary files. With a weld_tolerance
+    points closer than about that distance are merged as well, see weld().
 
-    - returns a tuple(triangles, triangles' normals, points).
+    stats
+       optional dict, receives the number of 'points' read and the number
+       of them 'merged' by welding.
+
+    - returns a tuple(triangles, triangles' normals, points) of arrays.
 
       triangles
-          A list of triangles, each triangle as a tuple of 3 index of
-          point in *points*.
+          (n, 3) int array, each triangle as 3 indices of points in
+          *points*.
 
       triangles' normals
-          A list of vectors3 (tuples, xyz).
+          (n, 3) float32 array (xyz).
 
       points
-          An indexed list of points, each point is a tuple of 3 float
-          (xyz).
+          (m, 3) float32 array of unique points (xyz), in order of
+          their first occurrence.
 
     Example of use:
 
@@ -262,23 +434,202 @@ def read_stl(filepath):
     import time
     start_time = time.process_time()
 
-    tris, tri_nors, pts = [], [], ListDict()
-
     with open(filepath, 'rb') as data:
         # check for ascii or binary
-        gen = _ascii_read if _is_ascii_file(data) else _binary_read
-
-        for nor, pt in gen(data):
-            # Add the triangle and the point.
-            # If the point is already in the list of points, the
-            # index returned by pts.add() will be the one from the
-            # first equal point inserted.
-            tris.append([pts.add(p) for p in pt])
-            tri_nors.append(nor)
+        if _is_ascii_file(data):
+            tri_nors, vertices = _ascii_read_arrays(data)
+            tris, pts = _index_points(vertices)
+        else:
+            tris, tri_nors, pts = _binary_read_mapped(data, ram_budget)
+
+    merged = 0
+    if weld_tolerance > 0:
+        tris, pts, merged = weld(tris, pts, weld_tolerance)
+        print('Welded %d of %d points.' % (merged, len(pts) + merged))
+    if stats is not None:
+        stats["points"] = len(pts) + merged
+        stats["merged"] = merged
 
     print('Import finished in %.4f sec.' % (time.process_time() - start_time))
 
-    return tris, tri_nors, pts.list
+    return tris, tri_nors, pts
+
+
+# facets of a preview from read_stl_preview()
+PREVIEW_FACETS = 100000
+# ascii bytes read by read_stl_preview() per preview facet, and per block
+PREVIEW_FACET_BYTES = 256
+PREVIEW_BLOCK_SIZE = 1 << 14
+
+
+def _ascii_preview(data, max_facets):
+    """
+    Return a tuple(normals, vertices) of the complete facets of evenly spread
+    blocks of an ascii stl file, reading about max_facets facets worth of it.
+    """
+    import os
+
+    data.seek(0, os.SEEK_END)
+    size = data.tell()
+    data.seek(0)
+    if size <= max_facets * PREVIEW_FACET_BYTES:
+        normals, vertices = _ascii_read_arrays(data)
+        return normals[:max_facets], vertices[:max_facets]
+
+    blocks = max(1, max_facets * PREVIEW_FACET_BYTES // PREVIEW_BLOCK_SIZE)
+    parts = []
+    for offset in np.linspace(0, size - PREVIEW_BLOCK_SIZE, blocks).astype(np.int64):
+        data.seek(int(offset))
+        block = data.read(PREVIEW_BLOCK_SIZE)
+        # only complete facets
+        start = block.find(b'facet normal')
+        end = block.rfind(b'endfacet')
+        if start >= 0 and end > start:
+            parts.append(_ascii_parse(block[start:end + len(b'endfacet')]))
+    if not parts:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3, 3), dtype=np.float32)
+    normals = np.concatenate([n for n, v in parts])
+    vertices = np.concatenate([v for n, v in parts])
+    return normals[:max_facets], vertices[:max_facets]
+
+
+def read_stl_preview(filepath, max_facets=PREVIEW_FACETS):
+    """
+    Return the triangles, normals and points of at most max_facets facets
+    of an stl file, like read_stl() does.
+
+    Binary files only decode every k-th facet from the mapped file. Of large
+    ascii files only evenly spread blocks are read, about max_facets times
+    PREVIEW_FACET_BYTES bytes, so the preview stays quick on any file size.
+    """
+    import mmap
+
+    with open(filepath, 'rb') as data:
+        if _is_ascii_file(data):
+            normals, vertices = _ascii_preview(data, max_facets)
+        else:
+            with mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                facets = _mapped_facets(data, mm)
+                stride = max(1, -(-len(facets) // max_facets))
+                # copied out of the map, which closes here
+                sample = facets[::stride].copy()
+                del facets
+            normals, vertices = sample["normal"], sample["vertices"]
+
+    tris, pts = _index_points(vertices)
+    return tris, normals, pts
+
+
+# facets or ascii blocks sampled by stl_info()
+INFO_SAMPLE_FACETS = 1000
+INFO_SAMPLE_BLOCKS = 16
+INFO_BLOCK_SIZE = 1 << 16
+
+
+def _ascii_info(data, size):
+    """
+    Estimate the facet count and bounds of an ascii stl file from evenly spread blocks of it.
+    """
+    if size <= INFO_SAMPLE_BLOCKS * INFO_BLOCK_SIZE:
+        normals, vertices = _ascii_read_arrays(data)
+        return len(normals), vertices.reshape(-1, 3), False
+
+    import re
+
+    facets = 0
+    sampled = 0
+    vertices = []
+    for offset in np.linspace(0, size - INFO_BLOCK_SIZE, INFO_SAMPLE_BLOCKS).astype(np.int64):
+        data.seek(int(offset))
+        block = data.read(INFO_BLOCK_SIZE)
+        # only complete lines
+        block = block[block.find(b'\n') + 1:block.rfind(b'\n')]
+        facets += block.count(b'endfacet')
+        sampled += len(block)
+        vertices.append(_ascii_floats(re.findall(rb'\bvertex' + _ASCII_NUMBERS, block)))
+    return int(round(facets * size / max(sampled, 1))), np.concatenate(vertices), True
+
+
+def stl_info(filepath, sample_facets=INFO_SAMPLE_FACETS):
+    """
+    Describe an stl file without parsing all of it.
+
+    - returns a dict with
+      ascii: the file is an ascii stl file
+      size: file size in bytes
+      facets: number of facets, from the header of binary files
+      estimated: facets was estimated from samples of a large ascii file
+      bounds: [min, max] corners of the sampled vertices, None without vertices
+    """
+    import os
+    import mmap
+
+    size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as data:
+        if size < BINARY_HEADER + 4 or _is_ascii_file(data):
+            ascii = True
+            facets, vertices, estimated = _ascii_info(data, size)
+        else:
+            ascii = estimated = False
+            with mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                mapped = _mapped_facets(data, mm)
+                facets = len(mapped)
+                stride = max(1, -(-facets // sample_facets))
+                vertices = mapped["vertices"][::stride].reshape(-1, 3).copy()
+                del mapped
+
+    bounds = None
+    if len(vertices):
+        bounds = [vertices.min(axis=0).tolist(), vertices.max(axis=0).tolist()]
+    return {"ascii": ascii, "size": size, "facets": facets, "estimated": estimated, "bounds": bounds}
+
+
+def read_stl_files(filepaths, threads=None, ram_budget=RAM_BUDGET, weld_tolerance=0.0):
+    """
+    Read several stl files concurrently.
+
+    filepaths
+       sequence of stl file paths
+
+    threads
+       number of reader threads, None uses one per core
+
+    ram_budget, weld_tolerance
+       passed on to read_stl()
+
+    - returns a generator over tuple(filepath, read_stl(filepath), stats),
+      stats being the dict read_stl() filled for the file, in the order of
+      filepaths. Only a few files are read ahead of the consumer,
+      so that large files do not pile up in memory.
+
+    Threads instead of processes: the work is memory mapped I/O and numpy
+    sorting, which run without the GIL, and the arrays are handed over
+    without pickling or copying them into shared memory. Blender's bundled
+    Python also starts the Blender binary for a spawned process.
+
+    This holds for binary files only. Tokenizing ascii files (re.findall()
+    and joining the number groups) keeps the GIL, so several ascii files
+    are read about one at a time; only their np.unique merge overlaps.
+    """
+    import os
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    if threads is None:
+        threads = os.cpu_count() or 1
+    threads = max(1, min(threads, len(filepaths)))
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="stl-read") as pool:
+        pending = deque()
+        for filepath in filepaths:
+            stats = {}
+            pending.append((filepath, pool.submit(read_stl, filepath, ram_budget, weld_tolerance, stats), stats))
+            if len(pending) >= 2 * threads:
+                filepath, future, stats = pending.popleft()
+                yield filepath, future.result(), stats
+        while pending:
+            filepath, future, stats = pending.popleft()
+            yield filepath, future.result(), stats
 
 
 if __name__ == '__main__':
@@ -80,6 +80,7 @@ class BlenderMesh():
 
         # Clear accessor cache after all primitives are done
         gltf.accessor_cache = {}
+        gltf.decode_cache = {}
 
         return mesh
 
@@ -12,13 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import bpy
-from mathutils import Vector
+import numpy as np
 
 from .gltf2_blender_material import BlenderMaterial
 from ..com.gltf2_blender_conversion import loc_gltf_to_blender
 from ...io.imp.gltf2_io_binary import BinaryData
-from ...io.com.gltf2_io_color_management import color_linear_to_srgb
+from ...io.com.gltf2_io_color_management import color_linear_to_srgb_array
 from ...io.com import gltf2_io_debug
 
 
@@ -44,14 +43,13 @@ class BlenderPrimitive():
             pyprimitive.num_faces = 0
             return
 
-        positions = BinaryData.get_data_from_accessor(gltf, attributes['POSITION'], cache=True)
+        positions = BinaryData.decode_accessor(gltf, attributes['POSITION'], cache=True)
 
         if pyprimitive.indices is not None:
             # Not using cache, this is not useful for indices
-            indices = BinaryData.get_data_from_accessor(gltf, pyprimitive.indices)
-            indices = [i[0] for i in indices]
+            indices = BinaryData.decode_accessor(gltf, pyprimitive.indices)[:, 0].astype(np.int64)
         else:
-            indices = list(range(len(positions)))
+            indices = np.arange(len(positions))
 
         bme_verts = bme.verts
         bme_edges = bme.edges
@@ -62,44 +60,33 @@ class BlenderPrimitive():
         #  pidx and the second the bidx. Need to keep them straight!
 
         # The pidx of all the vertices that are actually used by the primitive (only
-        # indices that appear in the pyprimitive.indices list are actually used)
-        used_pidxs = set(indices)
-        # Contains a pair (bidx, pidx) for every vertex in the primitive
-        vert_idxs = []
+        # indices that appear in the pyprimitive.indices list are actually used), sorted
+        used_pidxs = np.unique(indices)
+        # bidxs[i] is the bidx of the vertex with pidx used_pidxs[i]
+        bidxs = np.arange(len(used_pidxs)) + len(bme_verts)
         # pidx_to_bidx[pidx] will be the bidx of the vertex with that pidx (or -1 if
         # unused)
-        pidx_to_bidx = [-1] * len(positions)
-        bidx = len(bme_verts)
-        if bpy.app.debug:
-            used_pidxs = list(used_pidxs)
-            used_pidxs.sort()
-        for pidx in used_pidxs:
-            bme_verts.new(positions[pidx])
-            vert_idxs.append((bidx, pidx))
-            pidx_to_bidx[pidx] = bidx
-            bidx += 1
+        pidx_to_bidx = np.full(len(positions), -1, dtype=np.int64)
+        pidx_to_bidx[used_pidxs] = bidxs
+        for co in positions[used_pidxs].tolist():
+            bme_verts.new(co)
         bme_verts.ensure_lookup_table()
+        bidxs = bidxs.tolist()
 
         # Add edges/faces to bmesh
         mode = 4 if pyprimitive.mode is None else pyprimitive.mode
         edges, faces = BlenderPrimitive.edges_and_faces(mode, indices)
-        # NOTE: edges and vertices are in terms of pidxs!
-        for edge in edges:
+        # NOTE: edges and faces are in terms of pidxs, mapped to bidxs here
+        for edge in pidx_to_bidx[edges].tolist():
             try:
-                bme_edges.new((
-                    bme_verts[pidx_to_bidx[edge[0]]],
-                    bme_verts[pidx_to_bidx[edge[1]]],
-                ))
+                bme_edges.new((bme_verts[edge[0]], bme_verts[edge[1]]))
             except ValueError:
                 # Ignores duplicate/degenerate edges
                 pass
         pyprimitive.num_faces = 0
-        for face in faces:
+        for face in pidx_to_bidx[faces].tolist():
             try:
-                face = bme_faces.new(tuple(
-                    bme_verts[pidx_to_bidx[i]]
-                    for i in face
-                ))
+                face = bme_faces.new(tuple(bme_verts[i] for i in face))
 
                 if material_index is not None:
                     face.material_index = material_index
@@ -112,10 +99,10 @@ class BlenderPrimitive():
 
         # Set normals
         if 'NORMAL' in attributes:
-            normals = BinaryData.get_data_from_accessor(gltf, attributes['NORMAL'], cache=True)
+            normals = BinaryData.decode_accessor(gltf, attributes['NORMAL'], cache=True)
 
-            for bidx, pidx in vert_idxs:
-                bme_verts[bidx].normal = normals[pidx]
+            for bidx, normal in zip(bidxs, normals[used_pidxs].tolist()):
+                bme_verts[bidx].normal = normal
 
         # Set vertex colors. Add them in the order COLOR_0, COLOR_1, etc.
         set_num = 0
@@ -129,26 +116,24 @@ class BlenderPrimitive():
             layer_name = 'Col' if set_num == 0 else 'Col.%03d' % set_num
             layer = BlenderPrimitive.get_layer(bme.loops.layers.color, layer_name)
 
-            colors = BinaryData.get_data_from_accessor(gltf, attributes['COLOR_%d' % set_num], cache=True)
+            colors = BinaryData.decode_accessor(gltf, attributes['COLOR_%d' % set_num], cache=True)
 
             # Check whether Blender takes RGB or RGBA colors (old versions only take RGB)
-            is_rgba = len(colors[0]) == 4
+            is_rgba = colors.shape[1] == 4
             blender_num_components = len(bme_verts[0].link_loops[0][layer])
             if is_rgba and blender_num_components == 3:
                 gltf2_io_debug.print_console("WARNING",
                     "this Blender doesn't support RGBA vertex colors; dropping A"
                 )
 
-            for bidx, pidx in vert_idxs:
+            used_colors = colors[used_pidxs]
+            cols = np.ones((len(used_pidxs), 4))
+            cols[:, :3] = color_linear_to_srgb_array(used_colors[:, :3])
+            if is_rgba:
+                cols[:, 3] = used_colors[:, 3]
+            for bidx, col in zip(bidxs, cols[:, :blender_num_components].tolist()):
                 for loop in bme_verts[bidx].link_loops:
-                    color = colors[pidx]
-                    col = (
-                        color_linear_to_srgb(color[0]),
-                        color_linear_to_srgb(color[1]),
-                        color_linear_to_srgb(color[2]),
-                        color[3] if is_rgba else 1.0,
-                    )
-                    loop[layer] = col[:blender_num_components]
+                    loop[layer] = col
 
             set_num += 1
 
@@ -164,13 +149,12 @@ class BlenderPrimitive():
             layer_name = 'UVMap' if set_num == 0 else 'UVMap.%03d' % set_num
             layer = BlenderPrimitive.get_layer(bme.loops.layers.uv, layer_name)
 
-            uvs = BinaryData.get_data_from_accessor(gltf, attributes['TEXCOORD_%d' % set_num], cache=True)
+            uvs = BinaryData.decode_accessor(gltf, attributes['TEXCOORD_%d' % set_num], cache=True)
 
-            for bidx, pidx in vert_idxs:
-                # UV transform
-                u, v = uvs[pidx]
-                uv = (u, 1 - v)
+            # UV transform
+            uvs = np.stack((uvs[used_pidxs, 0], 1 - uvs[used_pidxs, 1]), axis=1)
 
+            for bidx, uv in zip(bidxs, uvs.tolist()):
                 for loop in bme_verts[bidx].link_loops:
                     loop[layer].uv = uv
 
@@ -181,8 +165,8 @@ class BlenderPrimitive():
         weight_sets = []
         set_num = 0
         while 'JOINTS_%d' % set_num in attributes and 'WEIGHTS_%d' % set_num in attributes:
-            joint_data = BinaryData.get_data_from_accessor(gltf, attributes['JOINTS_%d' % set_num], cache=True)
-            weight_data = BinaryData.get_data_from_accessor(gltf, attributes['WEIGHTS_%d' % set_num], cache=True)
+            joint_data = BinaryData.decode_accessor(gltf, attributes['JOINTS_%d' % set_num], cache=True)
+            weight_data = BinaryData.decode_accessor(gltf, attributes['WEIGHTS_%d' % set_num], cache=True)
 
             joint_sets.append(joint_data)
             weight_sets.append(weight_data)
@@ -193,12 +177,12 @@ class BlenderPrimitive():
             layer = BlenderPrimitive.get_layer(bme.verts.layers.deform, 'Vertex Weights')
 
             for joint_set, weight_set in zip(joint_sets, weight_sets):
-                for bidx, pidx in vert_idxs:
-                    for j in range(0, 4):
-                        weight = weight_set[pidx][j]
-                        if weight != 0.0:
-                            joint = joint_set[pidx][j]
-                            bme_verts[bidx][layer][joint] = weight
+                weights = weight_set[used_pidxs, :4]
+                # only the non-zero influences
+                rows, cols = np.nonzero(weights)
+                joints = joint_set[used_pidxs, :4][rows, cols].tolist()
+                for bidx, joint, weight in zip(np.array(bidxs)[rows].tolist(), joints, weights[rows, cols].tolist()):
+                    bme_verts[bidx][layer][joint] = weight
 
         # Set morph target positions (no normals/tangents)
         for sk, target in enumerate(pyprimitive.targets or []):
@@ -208,21 +192,21 @@ class BlenderPrimitive():
             layer_name = pymesh.shapekey_names[sk]
             layer = BlenderPrimitive.get_layer(bme.verts.layers.shape, layer_name)
 
-            morph_positions = BinaryData.get_data_from_accessor(gltf, target['POSITION'], cache=True)
+            morph_positions = BinaryData.decode_accessor(gltf, target['POSITION'], cache=True)
 
-            for bidx, pidx in vert_idxs:
-                bme_verts[bidx][layer] = (
-                    Vector(positions[pidx]) +
-                    Vector(morph_positions[pidx])
-                )
+            shape = positions[used_pidxs].astype(np.float64) + morph_positions[used_pidxs]
+            for bidx, co in zip(bidxs, shape.tolist()):
+                bme_verts[bidx][layer] = co
 
     @staticmethod
     def edges_and_faces(mode, indices):
-        """Converts the indices in a particular primitive mode into standard lists of
-        edges (pairs of indices) and faces (tuples of CCW indices).
+        """Converts the indices in a particular primitive mode into (n, 2) and
+        (m, 3) int arrays of edges (pairs of indices) and faces (CCW indices).
         """
-        es = []
-        fs = []
+        indices = np.asarray(indices, dtype=np.int64)
+        es = np.empty((0, 2), dtype=np.int64)
+        fs = np.empty((0, 3), dtype=np.int64)
+        n = len(indices)
 
         if mode == 0:
             # POINTS
@@ -232,61 +216,43 @@ class BlenderPrimitive():
             #   1   3
             #  /   /
             # 0   2
-            es = [
-                (indices[i], indices[i + 1])
-                for i in range(0, len(indices), 2)
-            ]
+            es = indices[:n // 2 * 2].reshape(-1, 2)
         elif mode == 2:
             # LINE LOOP
             #   1---2
             #  /     \
             # 0-------3
-            es = [
-                (indices[i], indices[i + 1])
-                for i in range(0, len(indices) - 1)
-            ]
-            es.append((indices[-1], indices[0]))
+            if n > 0:
+                es = np.stack((indices, np.roll(indices, -1)), axis=1)
         elif mode == 3:
             # LINE STRIP
             #   1---2
             #  /     \
             # 0       3
-            es = [
-                (indices[i], indices[i + 1])
-                for i in range(0, len(indices) - 1)
-            ]
+            es = np.stack((indices[:-1], indices[1:]), axis=1)
         elif mode == 4:
             # TRIANGLES
             #   2     3
             #  / \   / \
             # 0---1 4---5
-            fs = [
-                (indices[i], indices[i + 1], indices[i + 2])
-                for i in range(0, len(indices), 3)
-            ]
+            fs = indices[:n // 3 * 3].reshape(-1, 3)
         elif mode == 5:
             # TRIANGLE STRIP
             # 0---2---4
             #  \ / \ /
             #   1---3
-            def alternate(i, xs):
-                even = i % 2 == 0
-                return xs if even else (xs[0], xs[2], xs[1])
-            fs = [
-                alternate(i, (indices[i], indices[i + 1], indices[i + 2]))
-                for i in range(0, len(indices) - 2)
-            ]
+            if n >= 3:
+                fs = np.stack((indices[:-2], indices[1:-1], indices[2:]), axis=1)
+                # odd triangles are flipped to keep them CCW
+                fs[1::2, 1:] = fs[1::2, :0:-1]
         elif mode == 6:
             # TRIANGLE FAN
             #   3---2
             #  / \ / \
             # 4---0---1
-            fs = [
-                (indices[0], indices[i], indices[i + 1])
-                for i in range(1, len(indices) - 1)
-            ]
+            if n >= 3:
+                fs = np.stack((np.full(n - 2, indices[0]), indices[1:-1], indices[2:]), axis=1)
         else:
             raise Exception('primitive mode unimplemented: %d' % mode)
 
         return es, fs
-
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
+
 
 def color_srgb_to_scene_linear(c):
     """
@@ -35,3 +37,11 @@ def color_linear_to_srgb(c):
     else:
         return 1.055 * pow(c, 1.0 / 2.4) - 0.055
 
+def color_linear_to_srgb_array(c):
+    """
+    Convert a numpy array from linear to sRGB color space, like color_linear_to_srgb().
+    """
+    c = np.asarray(c, dtype=np.float64)
+    return np.where(c < 0.0031308,
+                    np.where(c < 0.0, 0.0, c * 12.92),
+                    1.055 * np.power(np.maximum(c, 0.0031308), 1.0 / 2.4) - 0.055)
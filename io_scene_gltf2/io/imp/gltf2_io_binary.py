@@ -14,6 +14,7 @@
 
 import struct
 import base64
+import numpy as np
 
 from ..com.gltf2_io import Accessor
 
@@ -23,6 +24,14 @@ class BinaryData():
     def __new__(cls, *args, **kwargs):
         raise RuntimeError("%s should not be instantiated" % cls)
 
+    # component type: (divisor, signed) of normalized integer components
+    NORMALIZATION = {
+        5120: (127.0, True),
+        5121: (255.0, False),
+        5122: (32767.0, True),
+        5123: (65535.0, False),
+    }
+
 # Note that this function is not used in Blender importer, but is kept in
 # Source code to be used in any pipeline that want to manage gltf/glb file in python
     @staticmethod
@@ -74,47 +83,71 @@ class BinaryData():
 
     @staticmethod
     def get_data_from_accessor_obj(gltf, accessor):
+        """Get data from accessor object, as a list of tuples."""
+        array = BinaryData.decode_accessor_obj(gltf, accessor)
+        return [tuple(element) for element in array.tolist()]
+
+    @staticmethod
+    def decode_accessor(gltf, accessor_idx, cache=False):
+        """Decode accessor into a numpy array."""
+        if accessor_idx in gltf.decode_cache:
+            return gltf.decode_cache[accessor_idx]
+
+        accessor = gltf.data.accessors[accessor_idx]
+        data = BinaryData.decode_accessor_obj(gltf, accessor)
+
+        if cache:
+            gltf.decode_cache[accessor_idx] = data
+
+        return data
+
+    @staticmethod
+    def decode_accessor_obj(gltf, accessor):
+        """Decode accessor object into a (count, component_nb) numpy array.
+
+        Arrays decoded straight from a buffer view are read-only views of
+        the buffer. Normalized accessors are decoded to float64.
+        """
+        dtype = np.dtype('<' + gltf.fmt_char_dict[accessor.component_type])
+        component_nb = gltf.component_nb_dict[accessor.type]
+
         if accessor.buffer_view is not None:
             bufferView = gltf.data.buffer_views[accessor.buffer_view]
             buffer_data = BinaryData.get_buffer_view(gltf, accessor.buffer_view)
 
             accessor_offset = accessor.byte_offset or 0
-            buffer_data = buffer_data[accessor_offset:]
-
-            fmt_char = gltf.fmt_char_dict[accessor.component_type]
-            component_nb = gltf.component_nb_dict[accessor.type]
-            fmt = '<' + (fmt_char * component_nb)
-            default_stride = struct.calcsize(fmt)
 
             # Special layouts for certain formats; see the section about
-            # data alignment in the glTF 2.0 spec.
-            component_size = struct.calcsize('<' + fmt_char)
-            if accessor.type == 'MAT2' and component_size == 1:
-                fmt = '<FFxxFF'.replace('F', fmt_char)
-                default_stride = 8
-            elif accessor.type == 'MAT3' and component_size == 1:
-                fmt = '<FFFxFFFxFFF'.replace('F', fmt_char)
-                default_stride = 12
-            elif accessor.type == 'MAT3' and component_size == 2:
-                fmt = '<FFFxxFFFxxFFF'.replace('F', fmt_char)
-                default_stride = 24
-
-            stride = bufferView.byte_stride or default_stride
+            # data alignment in the glTF 2.0 spec: matrix columns start on
+            # 4-byte boundaries.
+            columns = None
+            element_nb = component_nb
+            if accessor.type in ('MAT2', 'MAT3'):
+                rows = int(accessor.type[3])
+                padded_rows = -(-rows * dtype.itemsize // 4) * 4 // dtype.itemsize
+                if padded_rows != rows:
+                    columns = [c * padded_rows + r for c in range(rows) for r in range(rows)]
+                    element_nb = rows * padded_rows
+
+            stride = bufferView.byte_stride or element_nb * dtype.itemsize
 
             # Decode
-            unpack_from = struct.Struct(fmt).unpack_from
-            data = [
-                unpack_from(buffer_data, offset)
-                for offset in range(0, accessor.count*stride, stride)
-            ]
+            if accessor.count == 0:
+                data = np.empty((0, element_nb), dtype=dtype)
+            else:
+                data = np.ndarray(
+                    shape=(accessor.count, element_nb),
+                    dtype=dtype,
+                    buffer=buffer_data,
+                    offset=accessor_offset,
+                    strides=(stride, dtype.itemsize),
+                )
+            if columns is not None:
+                data = data[:, columns]
 
         else:
             # No buffer view; initialize to zeros
-            component_nb = gltf.component_nb_dict[accessor.type]
-            data = [
-                (0,) * component_nb
-                for i in range(accessor.count)
-            ]
+            data = np.zeros((accessor.count, component_nb), dtype=dtype)
 
         if accessor.sparse:
             sparse_indices_obj = Accessor.from_dict({
@@ -131,29 +164,20 @@ class BinaryData():
                 'componentType': accessor.component_type,
                 'type': accessor.type,
             })
-            sparse_indices = BinaryData.get_data_from_accessor_obj(gltf, sparse_indices_obj)
-            sparse_values = BinaryData.get_data_from_accessor_obj(gltf, sparse_values_obj)
+            sparse_indices = BinaryData.decode_accessor_obj(gltf, sparse_indices_obj)
+            sparse_values = BinaryData.decode_accessor_obj(gltf, sparse_values_obj)
 
             # Apply sparse
-            for i in range(accessor.sparse.count):
-                data[sparse_indices[i][0]] = sparse_values[i]
+            data = data.copy()
+            data[sparse_indices[:, 0]] = sparse_values
 
         # Normalization
         if accessor.normalized:
-            for idx, tuple in enumerate(data):
-                new_tuple = ()
-                for i in tuple:
-                    if accessor.component_type == 5120:
-                        new_tuple += (max(float(i / 127.0 ), -1.0),)
-                    elif accessor.component_type == 5121:
-                        new_tuple += (float(i / 255.0),)
-                    elif accessor.component_type == 5122:
-                        new_tuple += (max(float(i / 32767.0), -1.0),)
-                    elif accessor.component_type == 5123:
-                        new_tuple += (i / 65535.0,)
-                    else:
-                        new_tuple += (float(i),)
-                data[idx] = new_tuple
+            divisor, signed = BinaryData.NORMALIZATION.get(accessor.component_type, (1.0, False))
+            # float64, like the python floats the list decoder returned
+            data = data.astype(np.float64) / divisor
+            if signed:
+                np.maximum(data, -1.0, out=data)
 
         return data
 
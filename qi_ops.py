@@ -1,4 +1,4 @@
-import bpy,os,inspect,codecs,subprocess
+import bpy,os,inspect,codecs,subprocess,time
 from bpy_extras.io_utils import ImportHelper
 import math
 
@@ -17,7 +17,7 @@ from bpy.props import (StringProperty,
                        EnumProperty,
                        CollectionProperty)
 
-from .dxfimport.do import Do, Indicator
+from .dxfimport.do import Do, Indicator, prescan, LINKED_OBJECTS, GROUP_INSTANCES, COLLECTION_INSTANCES
 from . import qi_utils
 from .pc_lib import pc_utils
 
@@ -67,10 +67,9 @@ class qi_OT_drop(Operator):
             bpy.ops.qiimport_image.to_plane(filepath=self.filepath)
             bpy.ops.qi.place_asset()
         elif ext in {'.stl'}:
-            pass
+            bpy.ops.qi.stl('INVOKE_DEFAULT', filepath=self.filepath)
         elif ext in {'.dxf'}:
-            bpy.ops.qi.dxf(filepath=self.filepath)
-            bpy.ops.qi.place_asset()            
+            bpy.ops.qi.dxf('INVOKE_DEFAULT', filepath=self.filepath, place_asset=True)
         else:
             pass
 
@@ -227,35 +226,309 @@ class qi_OT_create_previews(Operator):
 
         return {'FINISHED'}
 
+def split_names(text):
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    return names if names else None
+
+class qi_DXFSelection(PropertyGroup):
+    """A layer or DXF type offered by the prescan of a dxf file"""
+    count: IntProperty(name='Count')
+    use: BoolProperty(name='Import', default=True)
+
+def fill_selection(collection, counts):
+    collection.clear()
+    for name in sorted(counts):
+        item = collection.add()
+        item.name = name
+        item.count = counts[name]
+
+def selected_names(collection):
+    """Names of the checked items, None if all of them are checked."""
+    names = [item.name for item in collection if item.use]
+    return None if len(names) == len(collection) else names
+
+BLOCK_REPRESENTATIONS = {'linked': LINKED_OBJECTS, 'group': GROUP_INSTANCES, 'collection': COLLECTION_INSTANCES}
+
 class qi_ImportDXF(Operator, ImportHelper):
     """Load a dxf file"""
     bl_idname = 'qi.dxf'
     bl_label = 'Import DXF File'
 
     filepath: StringProperty(name='Library Name')
+    place_asset: BoolProperty(name='Place Asset',
+                              description="Start placing the imported objects when the import has finished",
+                              default=False)
+    simplify_tolerance: FloatProperty(name='Simplify Tolerance',
+                                      description="Remove polyline vertices closer than this distance (in drawing units) to the simplified line, 0 keeps all vertices",
+                                      min=0.0,
+                                      default=0.0)
+    curves_as_edges: BoolProperty(name='Curves as Edges',
+                                  description="Tessellate lines, arcs and polylines once into edge-only meshes instead of curve objects",
+                                  default=False)
+    chord_tolerance: FloatProperty(name='Chord Tolerance',
+                                   description="Maximum distance between a curved segment and its tessellated edges",
+                                   min=0.00001,
+                                   default=0.001)
+    text_as_mesh: BoolProperty(name='Text as Mesh',
+                               description="Convert each distinct text once into a mesh that all its copies share",
+                               default=False)
+    anonymous_blocks: EnumProperty(name='Anonymous Blocks',
+                                   items=(('lazy', "Lazy", "Build anonymous blocks only when an INSERT uses them"),
+                                          ('skip', "Skip", "Neither parse nor import anonymous blocks (dimensions, hatches, dynamic blocks)"),
+                                          ('flatten', "Flatten", "Import inserted anonymous blocks as plain geometry")),
+                                   default='lazy')
+    block_representation: EnumProperty(name='Blocks',
+                                       items=(('linked', "Linked Objects", "One object per INSERT sharing the block's mesh or curve data"),
+                                              ('group', "Group Instances", "A parent empty per INSERT with a copy of the block objects"),
+                                              ('collection', "Collection Instances", "One collection per block, every INSERT is a collection-instance empty")),
+                                       default='linked')
+    layers: StringProperty(name='Layers',
+                           description="Comma separated names of the layers to import, empty imports all layers")
+    dxftypes: StringProperty(name='DXF Types',
+                             description="Comma separated DXF entity types to import, empty imports all types")
+    # filled by the prescan in invoke(), they replace layers and dxftypes when set
+    layer_selection: CollectionProperty(type=qi_DXFSelection, options={'SKIP_SAVE'})
+    dxftype_selection: CollectionProperty(type=qi_DXFSelection, options={'SKIP_SAVE'})
+    # set by invoke(), also for the file browser, so that only script callers import synchronously
+    interactive: BoolProperty(default=False, options={'HIDDEN', 'SKIP_SAVE'})
+
+    # seconds of import work per timer event of the modal import
+    time_budget = 0.05
+
+    _timer = None
+    _do = None
+    _steps = None
+
+    def create_do(self):
+        return Do(self.filepath, c=0, import_text=True, import_light=True, export_acis=True, merge_lines=True, do_bbox=True, block_rep=BLOCK_REPRESENTATIONS[self.block_representation], recenter=False,
+                  pDXF=None, pScene=None,thicknessWidth=True,but_group_by_att=True,dxf_unit_scale=.02,
+                  simplify_tolerance=self.simplify_tolerance,
+                  layers=self.selected_layers(),dxftypes=self.selected_dxftypes(),
+                  curves_as_edges=self.curves_as_edges,chord_tolerance=self.chord_tolerance,
+                  text_as_mesh=self.text_as_mesh,anonymous_blocks=self.anonymous_blocks)
+
+    def prescanned(self):
+        return len(self.layer_selection) > 0
+
+    def selected_layers(self):
+        if self.prescanned():
+            return selected_names(self.layer_selection)
+        return split_names(self.layers)
+
+    def selected_dxftypes(self):
+        if self.prescanned():
+            return selected_names(self.dxftype_selection)
+        return split_names(self.dxftypes)
+
+    def report_simplified(self, do):
+        if do.removed_vertices > 0:
+            self.report({'INFO'}, "Simplification removed {} vertices".format(do.removed_vertices))
+
+    def import_name(self):
+        return os.path.basename(self.filepath).replace(".dxf", "")
+
+    def select_new_objects(self, context, manifest):
+        bpy.ops.object.select_all(action='DESELECT')
+
+        # block geometry lives in its own scene and cannot be selected here
+        for obj in manifest["objects"]:
+            if context.scene in obj.users_scene:
+                context.view_layer.objects.active = obj
+                obj.select_set(True)
+
+    def draw(self, context):
+        layout = self.layout
+        if not self.prescanned():
+            for prop in ('place_asset', 'simplify_tolerance', 'curves_as_edges', 'chord_tolerance', 'text_as_mesh',
+                         'anonymous_blocks', 'block_representation', 'layers', 'dxftypes'):
+                layout.prop(self, prop)
+            return
+
+        layout.prop(self, 'block_representation')
+        row = layout.row()
+        for title, collection in (("Layers", self.layer_selection), ("DXF Types", self.dxftype_selection)):
+            col = row.column(align=True)
+            col.label(text=title)
+            for item in collection:
+                col.prop(item, "use", text="{} ({})".format(item.name, item.count))
 
     def execute(self, context):
-        current_obj_list = []
-        for obj in bpy.data.objects:    
-            current_obj_list.append(obj)
+        if self.interactive and not bpy.app.background and context.window is not None:
+            # confirmed selection dialog of invoke() or a file picked in the file browser
+            return self.start_modal(context)
 
-        do = Do(self.filepath, c=0, import_text=True, import_light=True, export_acis=True, merge_lines=True, do_bbox=True, block_rep=4, recenter=False,
-                pDXF=None, pScene=None,thicknessWidth=True,but_group_by_att=True,dxf_unit_scale=.02)     
-        errors = do.entities(os.path.basename(self.filepath).replace(".dxf", ""), None)    
+        do = self.create_do()
+        manifest = do.entities(self.import_name(), None)    
+        self.report_simplified(do)
         
-        new_obj_list = []
-        for obj in bpy.data.objects:    
-            if obj not in current_obj_list:
-                new_obj_list.append(obj)
+        self.select_new_objects(context, manifest)
+        if self.place_asset:
+            bpy.ops.qi.place_asset()
 
-        bpy.ops.object.select_all(action='DESELECT')
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        self.interactive = True
+        if not self.filepath:
+            return ImportHelper.invoke(self, context, event)
+
+        # let the user pick from the layers and types that actually occur in the drawing
+        _layers, counts = prescan(self.filepath)
+        layer_counts = {}
+        dxftype_counts = {}
+        for (layer, dxftype), count in counts.items():
+            layer_counts[layer] = layer_counts.get(layer, 0) + count
+            dxftype_counts[dxftype] = dxftype_counts.get(dxftype, 0) + count
+        if not counts:
+            return self.start_modal(context)
+        fill_selection(self.layer_selection, layer_counts)
+        fill_selection(self.dxftype_selection, dxftype_counts)
+        return context.window_manager.invoke_props_dialog(self, width=500)
+
+    def start_modal(self, context):
+        self._do = self.create_do()
+        self._steps = self._do.iter_entities(self.import_name(), context.scene)
+
+        wm = context.window_manager
+        wm.progress_begin(0, 1)
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            return self.cancel_import(context)
+        # the operator owns the only timer it listens to
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        deadline = time.perf_counter() + self.time_budget
+        try:
+            while True:
+                try:
+                    done, total = next(self._steps)
+                except StopIteration:
+                    return self.finish_import(context)
+                if time.perf_counter() >= deadline:
+                    break
+        except Exception as e:
+            self.cancel_import(context)
+            self.report({'ERROR'}, "DXF import failed: " + str(e))
+            return {'CANCELLED'}
+
+        context.window_manager.progress_update(done / total)
+        return {'PASS_THROUGH'}
+
+    def end_modal(self, context):
+        # safe to call twice, a failing finish_import() ends up in cancel_import() as well
+        if self._timer is None:
+            return
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        self._timer = None
+        wm.progress_end()
+        self._steps.close()
+
+    def finish_import(self, context):
+        self.end_modal(context)
+        self.report_simplified(self._do)
+        self.select_new_objects(context, self._do.manifest)
+        if self.place_asset:
+            bpy.ops.qi.place_asset()
+        return {'FINISHED'}
+
+    def cancel_import(self, context):
+        self.end_modal(context)
+        qi_utils.remove_datablocks(self._do.manifest)
+        self.report({'INFO'}, "DXF import cancelled")
+        return {'CANCELLED'}
+
+
+# custom properties of a dropped stl preview, the second one is set by qi.place_asset
+STL_PREVIEW = "qi_stl_preview"
+STL_PLACED = "qi_stl_placed"
+
+class qi_ImportSTL(Operator):
+    """Drop an stl file: place a decimated preview while the full mesh loads in the background"""
+    bl_idname = 'qi.stl'
+    bl_label = 'Import STL File'
+
+    filepath: StringProperty(name='Library Name')
+    preview_facets: IntProperty(name='Preview Facets',
+                                description="Maximum number of facets of the preview that is placed while the full mesh loads",
+                                min=1000,
+                                default=100000)
+
+    _timer = None
+    _preview = None
+    _future = None
+
+    def import_name(self):
+        return bpy.path.display_name(os.path.basename(self.filepath))
+
+    def invoke(self, context, event):
+        from concurrent.futures import ThreadPoolExecutor
+        from mathutils import Matrix
+        from .io_mesh_stl import stl_utils, blender_utils
 
-        for obj in new_obj_list:
-            context.view_layer.objects.active = obj
-            obj.select_set(True)
+        # the full read only touches numpy, so it can run while the preview is placed
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stl-drop")
+        self._future = pool.submit(stl_utils.read_stl, self.filepath)
+        pool.shutdown(wait=False)
 
+        tris, tri_nors, pts = stl_utils.read_stl_preview(self.filepath, self.preview_facets)
+        if bpy.ops.object.select_all.poll():
+            bpy.ops.object.select_all(action='DESELECT')
+        self._preview = blender_utils.create_and_link_mesh(self.import_name(), tris, None, pts, Matrix())
+        self._preview[STL_PREVIEW] = True
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.1, window=context.window)
+        wm.modal_handler_add(self)
+        bpy.ops.qi.place_asset()
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        # the operator owns the only timer it listens to
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        try:
+            placed = self._preview.get(STL_PLACED, False)
+        except ReferenceError:
+            # placement was cancelled and removed the preview
+            self.end_modal(context)
+            return {'CANCELLED'}
+
+        if not placed or not self._future.done():
+            return {'PASS_THROUGH'}
+
+        # the timer goes first, whatever happens to the swap
+        self.end_modal(context)
+        try:
+            tris, tri_nors, pts = self._future.result()
+            self.swap_mesh(tris, pts)
+        except Exception as e:
+            self.report({'ERROR'}, "STL import failed, keeping the preview: " + str(e))
+            return {'CANCELLED'}
         return {'FINISHED'}
 
+    def swap_mesh(self, tris, pts):
+        from mathutils import Matrix
+        from .io_mesh_stl import blender_utils
+
+        obj = self._preview
+        preview_mesh = obj.data
+        obj.data = blender_utils.create_mesh(self.import_name(), tris, None, pts, Matrix())
+        bpy.data.meshes.remove(preview_mesh)
+        del obj[STL_PREVIEW]
+        del obj[STL_PLACED]
+
+    def end_modal(self, context):
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+
 
 class qi_ImportGLTF2(Operator, ImportHelper):
     """Load a glTF 2.0 file"""
@@ -435,6 +708,8 @@ class qi_OT_place_asset(bpy.types.Operator):
     
     def finish(self,context):
         context.window.cursor_set('DEFAULT')
+        if STL_PREVIEW in self.obj:
+            self.obj[STL_PLACED] = True
         if self.drawing_plane:
             pc_utils.delete_obj_list([self.drawing_plane])
         bpy.ops.object.select_all(action='DESELECT')
@@ -452,7 +727,9 @@ classes = (
     qi_OT_save_active_path,
     qi_OT_create_previews,
     qi_ImportGLTF2,
+    qi_DXFSelection,
     qi_ImportDXF,
+    qi_ImportSTL,
     qi_OT_place_asset,
 )
 
@@ -16,6 +16,10 @@ from bpy.props import (
         EnumProperty,
         )
 from mathutils import Vector
+from . import qi_utils
+
+# stl files with more facets get a warning in the file browser header
+STL_LARGE_FACETS = 5000000
 
 def update_active_path(self,context):
     bpy.ops.qi.activate()
@@ -306,6 +310,34 @@ class qi_Scene_Props(PropertyGroup):
         if self.library_tabs == 'OBJ':
             pass #TODO
 
+    def draw_stl_info(self,layout,context):
+        params = getattr(context.space_data, "params", None)
+        if params is None or not params.filename.lower().endswith(".stl"):
+            return
+        directory = params.directory
+        if isinstance(directory, bytes):
+            directory = directory.decode('utf-8')
+        filepath = os.path.join(directory, params.filename)
+        if not os.path.isfile(filepath):
+            return
+
+        try:
+            info = qi_utils.get_stl_info(filepath)
+        except (OSError, ValueError):
+            # unreadable or broken file, the import reports the details
+            return
+        facets = "~{:,}" if info["estimated"] else "{:,}"
+        text = (facets + " facets, {:.1f} MB, {}").format(info["facets"], info["size"] / 1e6,
+                                                          "ASCII" if info["ascii"] else "Binary")
+        large = info["facets"] > STL_LARGE_FACETS
+        row = layout.row()
+        row.label(text=text, icon='ERROR' if large else 'MESH_DATA')
+        if info["bounds"]:
+            low, high = info["bounds"]
+            row.label(text="Size {:.4g} x {:.4g} x {:.4g}".format(*(h - l for l, h in zip(low, high))))
+        if large:
+            layout.label(text="Large mesh, importing may take a while", icon='INFO')
+
     def draw_filebrowser_header(self,layout,context):
         row = layout.row()
         row.scale_y = 1.3
@@ -328,6 +360,8 @@ class qi_Scene_Props(PropertyGroup):
             row.operator('qi.save_active_path',text="",icon='ADD') 
             row.operator('qi.set_output_path',text="",icon='EXPORT') 
 
+        self.draw_stl_info(layout,context)
+
     @classmethod
     def register(cls):
         bpy.types.Scene.qi = PointerProperty(
@@ -1,8 +1,56 @@
 import bpy
 import os
+import json
 
 def get_scene_props(scene):
     return scene.qi
 
 def get_library_path():
     return os.path.join(os.path.dirname(__file__),"library")
+
+def remove_datablocks(manifest):
+    """Removes the datablocks of an import manifest ({bpy.data collection name: list of datablocks})."""
+    for attr, blocks in manifest.items():
+        data = getattr(bpy.data, attr)
+        for block in blocks:
+            data.remove(block)
+
+# sidecar file of each library folder with the stl_info() of its stl files
+STL_INDEX_NAME = ".qi_stl_index.json"
+
+# folder path: {file name: stl_info() plus the mtime it was taken at}
+_stl_indexes = {}
+
+def _load_stl_index(directory):
+    index = _stl_indexes.get(directory)
+    if index is None:
+        try:
+            with open(os.path.join(directory, STL_INDEX_NAME)) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        _stl_indexes[directory] = index
+    return index
+
+def _save_stl_index(directory, index):
+    try:
+        with open(os.path.join(directory, STL_INDEX_NAME), 'w') as f:
+            json.dump(index, f)
+    except OSError:
+        # read-only libraries keep their index in memory
+        pass
+
+def get_stl_info(filepath):
+    """Returns the stl_info() of an stl file, cached per path and mtime in memory and in the folder's sidecar index."""
+    from .io_mesh_stl import stl_utils
+
+    directory, name = os.path.split(os.path.abspath(filepath))
+    index = _load_stl_index(directory)
+    mtime = os.path.getmtime(filepath)
+    info = index.get(name)
+    if info is None or info.get("mtime") != mtime:
+        info = stl_utils.stl_info(filepath)
+        info["mtime"] = mtime
+        index[name] = info
+        _save_stl_index(directory, index)
+    return info